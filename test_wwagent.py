@@ -0,0 +1,192 @@
+# Regression checks for the KnowledgeBase methods, run with python -m pytest
+#
+# Random KBs are asked through every method and compared with a brute force
+# count of their models, or with the tt method once that one is checked.
+
+import itertools
+import random
+import time
+
+import pytest
+
+from wwagent import KnowledgeBase
+
+OPERATORS = ["and", "or", "implies", "iff"]
+
+
+def random_formula(rng, symbols, depth=3):
+    if depth == 0 or rng.random() < 0.3:
+        symbol = rng.choice(symbols)
+        return symbol if rng.random() < 0.6 else ["not", symbol]
+    if rng.random() < 0.2:
+        return ["not", random_formula(rng, symbols, depth - 1)]
+    if rng.random() < 0.1:
+        return [random_formula(rng, symbols, depth - 1)]
+    return [
+        random_formula(rng, symbols, depth - 1),
+        rng.choice(OPERATORS),
+        random_formula(rng, symbols, depth - 1),
+    ]
+
+
+def holds(formula, model):
+    if isinstance(formula, str):
+        return model[formula]
+    if len(formula) == 1:
+        return holds(formula[0], model)
+    if formula[0] == "not":
+        return not holds(formula[1], model)
+    left = holds(formula[0], model)
+    right = holds(formula[2], model)
+    return {
+        "and": left and right,
+        "or": left or right,
+        "implies": not left or right,
+        "iff": left == right,
+    }[formula[1]]
+
+
+def brute_force_ratio(kb, alpha, symbols):
+    true_count = total_count = 0
+    for values in itertools.product([False, True], repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if all(holds(clause, model) for clause in kb):
+            total_count += 1
+            true_count += holds(alpha, model)
+    return true_count / total_count if total_count else 0
+
+
+def new_kb(method="tt"):
+    kb = KnowledgeBase(method)
+    kb.show_progress = False
+    return kb
+
+
+def chain_ratio(n, k):
+    """Share of the models of the chain s_i or s_i+1 over n symbols with s_k"""
+
+    def count(forced):
+        # models ending with a false / true symbol so far
+        ending_false, ending_true = 1, 1
+        if forced == 0:
+            ending_false = 0
+        for i in range(1, n):
+            ending_false, ending_true = ending_true, ending_false + ending_true
+            if i == forced:
+                ending_false = 0
+        return ending_false + ending_true
+
+    return count(k) / count(None)
+
+
+def test_tt_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(200):
+        symbols = ["s%d" % i for i in range(rng.randint(1, 7))]
+        clauses = [random_formula(rng, symbols) for _ in range(rng.randint(1, 5))]
+        alphas = [random_formula(rng, symbols + ["free"]) for _ in range(3)]
+        kb = new_kb()
+        kb.block_bits = rng.randint(0, 4)
+        for clause in clauses:
+            kb.tell(clause)
+        for alpha, result in zip(alphas, kb.ask_all(alphas)):
+            expected = brute_force_ratio(clauses, alpha, symbols + ["free"])
+            assert abs(result - expected) < 1e-12, (clauses, alpha)
+
+
+def test_dpll_matches_tt():
+    rng = random.Random(5)
+    for _ in range(300):
+        symbols = ["s%d" % i for i in range(rng.randint(1, 8))]
+        clauses = [
+            random_formula(rng, symbols, rng.randint(0, 4))
+            for _ in range(rng.randint(1, 10))
+        ]
+        alpha = random_formula(rng, symbols + ["free"])
+        tt = new_kb()
+        dpll = new_kb("dpll")
+        for clause in clauses:
+            tt.tell(clause)
+            dpll.tell(clause)
+        ratio = tt.ask(alpha)
+        expected = 1 if ratio == 1 else 0 if ratio == 0 else 0.5
+        assert dpll.ask(alpha) == expected, (clauses, alpha)
+
+
+def test_atoms_and_their_ids_are_one_symbol():
+    for method in ("tt", "dpll", "models"):
+        kb = new_kb(method)
+        kb.tell(["a", "or", "b"])
+        kb.tell(["not", kb.symbol_id("b")])
+        assert kb.ask(kb.symbol_id("a")) == 1, method
+        assert kb.ask([kb.intern("p", 0, 0), "or", "a"]) == 1, method
+        with pytest.raises(ValueError):
+            kb.ask(7)
+
+
+def test_sampled_ratio_within_bounds():
+    for n in (30, 60):
+        kb = new_kb()
+        kb.block_bits = 14
+        kb.samples = 1 << 14
+        for i in range(n - 1):
+            kb.tell(["s%d" % i, "or", "s%d" % (i + 1)])
+        [(estimate, low, high)] = kb.ask_bounds(["s5"])
+        assert kb.stats["models_sampled"] > 0
+        assert low <= chain_ratio(n, 5) <= high
+        assert abs(estimate - chain_ratio(n, 5)) < 0.02
+
+
+def test_sampled_inconsistent_kb():
+    kb = new_kb()
+    kb.model_budget = 1 << 20
+    for i in range(25):
+        kb.tell(["s%d" % i, "or", "s%d" % (i + 1)])
+    kb.tell([["y", "or", "z"], "and", [["not", "y"], "and", ["not", "z"]]])
+    assert kb.ask_bounds(["s1"]) == [(0, 0, 0)]
+
+
+def test_time_budget_bounds_a_sampled_ask():
+    for n, budget in ((60, 0.2), (240, 0.1)):
+        kb = new_kb()
+        kb.time_budget = budget
+        for i in range(n - 1):
+            kb.tell(["s%d" % i, "or", "s%d" % (i + 1)])
+        start = time.perf_counter()
+        [(estimate, low, high)] = kb.ask_bounds(["s5"])
+        assert time.perf_counter() - start < budget + 0.1
+        # how many models fit in the budget depends on the machine, a
+        # large kb may get none and answer 0.5 between 0 and 1
+        if high - low < 1:
+            assert abs(estimate - chain_ratio(n, 5)) < 0.1
+
+
+def test_models_method_matches_tt():
+    rng = random.Random(11)
+    fixed = 0
+    for _ in range(300):
+        groups = [
+            ["g%ds%d" % (g, i) for i in range(rng.randint(1, 4))]
+            for g in range(rng.randint(1, 4))
+        ]
+        symbols = sum(groups, [])
+        tt = new_kb()
+        models = new_kb("models")
+        if rng.random() < 0.3:
+            models.max_model_symbols = rng.randint(1, 5)
+        for _ in range(rng.randint(1, 10)):
+            if rng.random() < 0.4:
+                # units fix their symbol, see fix_model_symbol
+                symbol = rng.choice(symbols)
+                clause = rng.choice([symbol, ["not", symbol]])
+            else:
+                clause = random_formula(rng, rng.choice(groups), 2)
+            tt.tell(clause)
+            models.tell(clause)
+            alphas = [
+                random_formula(rng, rng.choice(groups) + ["free"], 2) for _ in range(3)
+            ]
+            for x, y in zip(tt.ask_all(alphas), models.ask_all(alphas)):
+                assert abs(x - y) < 1e-12, (tt.kb, alphas)
+        fixed += len(models.fixed_values)
+    assert fixed
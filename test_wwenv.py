@@ -0,0 +1,38 @@
+# Regression checks for VectorSimulation, run with python -m pytest
+
+import random
+
+from wwenv import *
+
+# moves weigh more, so that episodes get away from the start
+CHOICES = (MOVE, MOVE, MOVE, LEFT, RIGHT, GRAB, SHOOT, CLIMB, EXIT)
+
+
+def test_step_matches_simulation():
+    # Simulation.step is checked against the old rules in test_wwsim.py
+    count = 32
+    for rows, cols in ((4, 4), (3, 5), (6, 6)):
+        env = VectorSimulation(count, rows, cols, 0.2, seed=rows)
+        observations = env.reset()
+        sims = []
+        for k in range(count):
+            sim = Simulation(rows, cols, 0, verbose=False)
+            sim.load_world(env.worlds[k])
+            assert sim.percepts[sim.room(*sim.start)] == observations[k]
+            sims.append(sim)
+        rng = random.Random(1)
+        episodes = 0
+        for _ in range(1000):
+            actions = [rng.choice(CHOICES) for _ in range(count)]
+            observations, rewards, dones = env.step(actions)
+            for k, sim in enumerate(sims):
+                percept, reward, done = sim.step(actions[k])
+                assert (reward, done) == (rewards[k], dones[k])
+                if done:
+                    # the vector reset world k already, follow it
+                    episodes += 1
+                    sim.reset_stats(0)
+                    sim.load_world(env.worlds[k])
+                    percept = sim.percepts[sim.room(*sim.start)]
+                assert percept == observations[k]
+        assert episodes > count
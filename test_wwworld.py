@@ -0,0 +1,35 @@
+# Regression checks for wwworld, run with python -m pytest
+
+import random
+
+from wwworld import *
+
+
+def test_bernoulli_bits_density():
+    rng = random.Random(0)
+    lanes = 1 << 14
+    for p in (0.0, 0.2, 0.5, 0.75):
+        count = bin(bernoulli_bits(rng, lanes, p)).count("1")
+        assert abs(count / lanes - p) < 0.02
+    assert bernoulli_bits(rng, lanes, 1.0) == (1 << lanes) - 1
+    assert bernoulli_bits(rng, lanes, 1.5) == (1 << lanes) - 1
+    assert bernoulli_bits(rng, lanes, -0.5) == 0
+
+
+def test_generate_worlds_full_density():
+    rows, cols = 4, 4
+    start = (rows - 1) * cols
+    cells = edge_masks(rows, cols)[0]
+    for world in generate_worlds(20, rows, cols, 1.0, seed=1):
+        assert world.pits == cells & ~(1 << start)
+        assert world.wumpus != start and world.gold not in (start, world.wumpus)
+        assert world.breeze == adjacent(world.pits, rows, cols)
+
+
+def test_world_percepts():
+    world = make_world(4, 4, pits=1 << 5, wumpus=3, gold=0)
+    percepts = world_percepts(world)
+    assert percepts[0] == GLITTER
+    assert percepts[2] == percepts[7] == STENCH
+    assert percepts[1] == BREEZE and percepts[4] == BREEZE
+    assert percepts[12] == 0
@@ -24,12 +24,53 @@ wumpus world simulation -----  dml Fordham 2019
 
 """
 
+import math
+import random
+import sys
+import time
+from collections import OrderedDict, deque
+
+# Operator codes of compiled programs, see KnowledgeBase.compile
+OP_NOT = -1
+OP_AND = -2
+OP_OR = -3
+OP_IMPLIES = -4
+OP_IFF = -5
+OP_TRUE = -6
+OP_FALSE = -7
+OPCODES = {"and": OP_AND, "or": OP_OR, "implies": OP_IMPLIES, "iff": OP_IFF}
+
 
 class WWAgent:
-    def __init__(self):
-        self.max = 4  # number of cells in one side of square world
+    # one agent per live simulation, so keep them small
+    __slots__ = (
+        "max",
+        "stopTheAgent",
+        "position",
+        "start",
+        "directions",
+        "facing",
+        "arrow",
+        "percepts",
+        "map",
+        "kb",
+        "inference",
+        "pit_prior",
+        "wumpus_dead",
+        "planned_destination",
+        "visited",
+        "safe_cells",
+        "distance_maps",
+        "beliefs",
+        "max_pit_cells",
+        "verbose",
+    )
+
+    def __init__(self, inference="kb", verbose=True, size=4, pit_prior=0.2):
+        self.max = size  # number of cells in one side of square world
         self.stopTheAgent = False  # set to true to stop the agent at end of episode
-        self.position = (0, 3)  # top is (0,0)
+        self.position = (0, size - 1)  # top is (0,0)
+        self.start = self.position
         self.directions = ["up", "right", "down", "left"]
         self.facing = "right"
         self.arrow = 1
@@ -38,10 +79,26 @@ class WWAgent:
 
         # KnowledgeBase object, see bottom
         self.kb = KnowledgeBase()
+        # a quiet agent also keeps its kb from drawing progress
+        self.kb.show_progress = verbose and sys.stdout.isatty()
+
+        # "kb" asks the KnowledgeBase, "frontier" uses the pit prior, see frontier_safety
+        self.inference = inference
+        self.pit_prior = pit_prior  # chance that the simulation puts a pit in a room
+        self.wumpus_dead = False
 
         self.planned_destination = None
         self.visited = dict()
-        print("New agent created")
+        # cells known to be safe, routes only go through them, see route_step
+        self.safe_cells = set()
+        # distance_map results by goal, cleared when safe_cells grows
+        self.distance_maps = {}
+        # pit and wumpus posteriors of the frontier mode, see frontier_beliefs
+        self.beliefs = None
+        self.max_pit_cells = 16
+        self.verbose = verbose  # print what the agent is doing
+        if self.verbose:
+            print("New agent created")
 
     def update(self, percept):
         self.percepts = percept
@@ -58,16 +115,16 @@ class WWAgent:
             clause = []
             for dir in self.get_directions():
                 if not clause:
-                    clause = ["w{dir}"]
+                    clause = [self.cell_symbol("w", dir)]
                 else:
-                    clause = [f"w{dir}", "or", [clause]]
+                    clause = [self.cell_symbol("w", dir), "or", [clause]]
             self.kb.tell(clause)
         else:
             # print(
             #     f"Agent detected a no stench at {self.position}, put no wumpus in neighbors"
             # )
             for dir in self.get_directions():
-                self.kb.tell(["not", f"w{dir}"])
+                self.kb.tell(["not", self.cell_symbol("w", dir)])
 
         # breeze, tell kb about possible pit locations
         if "breeze" in self.percepts:
@@ -75,25 +132,29 @@ class WWAgent:
             clause = []
             for dir in self.get_directions():
                 if not clause:
-                    clause = ["p{dir}"]
+                    clause = [self.cell_symbol("p", dir)]
                 else:
-                    clause = [f"p{dir}", "or", [clause]]
+                    clause = [self.cell_symbol("p", dir), "or", [clause]]
             self.kb.tell(clause)
         else:
             # print(
             #     f"Agent detected a no breeze at {self.position}, put no pits in neighbors"
             # )
             for dir in self.get_directions():
-                self.kb.tell(["not", f"p{dir}"])
+                self.kb.tell(["not", self.cell_symbol("p", dir)])
 
         # not dead
-        self.kb.tell(["not", f"w{self.position[0]}{self.position[1]}"])
-        self.kb.tell(["not", f"p{self.position[0]}{self.position[1]}"])
+        self.kb.tell(["not", self.cell_symbol("w", self.position)])
+        self.kb.tell(["not", self.cell_symbol("p", self.position)])
+
+        if "scream" in self.percepts:
+            self.wumpus_dead = True
 
         if self.position in self.visited:
             self.visited[self.position] += 1
         else:
             self.visited[self.position] = 1
+        self.mark_safe([self.position])
 
     def calculateNextPosition(self, action):
         if self.facing == "up":
@@ -131,57 +192,82 @@ class WWAgent:
     def action(self):
         # test for controlled exit at end of successful gui episode
         if self.stopTheAgent:
-            print("Agent has won this episode.")
+            if self.verbose:
+                print("Agent has won this episode.")
             return "exit"  # will cause the episide to end
 
         # reflect action -- get the gold!
         if "glitter" in self.percepts:
-            print("Agent will grab the gold!")
+            if self.verbose:
+                print("Agent will grab the gold!")
             self.stopTheAgent = True
             return "grab"
 
         if self.visited[self.position] > 100:
-            print("Exceeded limit, unsolvable")
-            print("Visisted:", self.visited)
+            if self.verbose:
+                print("Exceeded limit, unsolvable")
+                print("Visisted:", self.visited)
             return "exit"
 
         if not self.planned_destination or self.planned_destination == self.position:
             possible_moves = []
-            possible_dirs = self.get_directions()
-            if not possible_dirs:
-                print("No possible move")
-                return
-            for dir in self.get_directions():
-                prob = self.kb.ask([["not", f"w{dir}"], "and", ["not", f"p{dir}"]])
-                pos_tuple = (int(dir[0]), int(dir[1]))
-                visits = self.visited.get(pos_tuple, 0)
-                # adjust probability based on visits, less visited = more likely to choose
-                adjusted_prob = prob * (1 / (1 + visits / 10))
-                possible_moves.append((adjusted_prob, pos_tuple))
+            candidates = self.frontier_cells()
+            if not candidates:
+                if self.verbose:
+                    print("No possible move")
+                return "exit"
+            if self.inference == "frontier":
+                # exact, so each estimate is its own bounds
+                bounds = [
+                    (prob, prob, prob) for prob in map(self.frontier_safety, candidates)
+                ]
+            else:
+                # one enumeration scores every frontier cell, a sampled
+                # estimate is only trusted as far as its bounds go
+                bounds = self.kb.ask_bounds(
+                    [self.safe_query(cell) for cell in candidates]
+                )
+            self.mark_safe(
+                cell for cell, (_, low, _) in zip(candidates, bounds) if low == 1
+            )
+            # steps to reach each cell from here, through safe cells
+            distances = self.distance_map(self.position)
+            for cell, (prob, _, high) in zip(candidates, bounds):
+                steps = 1 + min(
+                    distances.get(neighbor, self.max * self.max)
+                    for neighbor in self.get_neighbors(cell)
+                )
+                if high > 0:
+                    possible_moves.append((prob, -steps, cell))
 
             if not possible_moves:
-                # No 100% safe move
-                print("No safe move")
+                # every frontier cell is deadly
+                if self.verbose:
+                    print("No safe move")
                 return "exit"
             else:
-                # Sort possible moves based on probability of safety (highest first)
-                possible_moves.sort(reverse=True, key=lambda x: x[0])
-                print(
-                    "Sorted possible moves based on safety probability:", possible_moves
-                )
-                prob, move = possible_moves[0]
-                self.planned_destination = (int(move[0]), int(move[1]))
+                # Sort possible moves based on probability of safety (highest
+                # first), then on the number of steps to get there
+                possible_moves.sort(reverse=True, key=lambda x: x[:2])
+                if self.verbose:
+                    print(
+                        "Sorted possible moves based on safety probability:",
+                        possible_moves,
+                    )
+                prob, steps, move = possible_moves[0]
+                self.planned_destination = move
                 # print("setting planned action to", self.planned_destination)
 
-        # move towards planned destination
-        if self.planned_destination[0] == self.position[0]:
+        # move towards planned destination, through safe cells
+        next_cell = self.route_step(self.planned_destination)
+        if next_cell[0] == self.position[0]:
             # vertical move
-            if self.planned_destination[1] < self.position[1]:
+            if next_cell[1] < self.position[1]:
                 goal_face = "up"
             else:
                 goal_face = "down"
         else:
-            if self.planned_destination[0] > self.position[0]:
+            if next_cell[0] > self.position[0]:
                 goal_face = "right"
             else:
                 goal_face = "left"
@@ -203,119 +289,1065 @@ class WWAgent:
             new_x = self.position[0] + dirs[k]
             new_y = self.position[1] + dirs[k + 1]
             if new_x >= 0 and new_x < self.max and new_y >= 0 and new_y < self.max:
-                surroundings.append(f"{new_x}{new_y}")
+                surroundings.append((new_x, new_y))
         return surroundings
 
+    def cell_symbol(self, kind, cell):
+        """KB symbol for a wumpus ("w") or a pit ("p") in cell"""
+        return self.kb.intern(kind, cell[0], cell[1])
+
+    def safe_query(self, cell):
+        """Formula asking the KB that cell has no wumpus and no pit"""
+        return [
+            ["not", self.cell_symbol("w", cell)],
+            "and",
+            ["not", self.cell_symbol("p", cell)],
+        ]
+
+    def get_neighbors(self, cell):
+        """Cells next to cell that are inside the world"""
+        neighbors = []
+        for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+            x, y = cell[0] + dx, cell[1] + dy
+            if 0 <= x < self.max and 0 <= y < self.max:
+                neighbors.append((x, y))
+        return neighbors
+
+    def frontier_cells(self):
+        """Unvisited cells next to a visited cell, in the order they were found"""
+        cells = {}
+        for visited in self.visited:
+            for neighbor in self.get_neighbors(visited):
+                if neighbor not in self.visited:
+                    cells[neighbor] = True
+        return list(cells)
+
+    def mark_safe(self, cells):
+        """Add cells to safe_cells, dropping the distance maps if it grows"""
+        size = len(self.safe_cells)
+        self.safe_cells.update(cells)
+        if len(self.safe_cells) != size:
+            self.distance_maps.clear()
+
+    def distance_map(self, goal):
+        """Steps from goal to each cell it reaches through safe cells.
+
+        A breadth-first search from goal, cached until safe_cells grows.
+        """
+        distances = self.distance_maps.get(goal)
+        if distances is None:
+            distances = {goal: 0}
+            queue = deque([goal])
+            while queue:
+                cell = queue.popleft()
+                for neighbor in self.get_neighbors(cell):
+                    if neighbor in self.safe_cells and neighbor not in distances:
+                        distances[neighbor] = distances[cell] + 1
+                        queue.append(neighbor)
+            self.distance_maps[goal] = distances
+        return distances
+
+    def route_step(self, goal):
+        """Next cell on a shortest route to goal that only crosses safe cells"""
+        distances = self.distance_map(goal)
+        return min(
+            self.get_neighbors(self.position),
+            key=lambda cell: distances.get(cell, self.max * self.max),
+        )
+
+    def frontier_safety(self, cell):
+        """Probability that cell holds neither a pit nor a live wumpus.
+
+        Pits and the wumpus are placed independently and are sensed by
+        different percepts, so the two posteriors multiply.
+        """
+        return (1 - self.pit_probability(cell)) * (1 - self.wumpus_probability(cell))
+
+    def pit_probability(self, cell):
+        """Posterior probability of a pit in cell given the breezes sensed so far"""
+        return self.frontier_beliefs()[1].get(cell, self.pit_prior)
+
+    def wumpus_probability(self, cell):
+        """Posterior probability of the live wumpus in cell given the stenches sensed so far"""
+        rooms, inside, probability = self.frontier_beliefs()[2]
+        return probability if (cell in rooms) == inside else 0
+
+    def frontier_beliefs(self):
+        """(key, pit_probabilities(), wumpus_rooms()) for the percepts so far.
+
+        Percepts only change when a new cell is visited, or the wumpus
+        dies, so one computation serves every frontier cell until then.
+        """
+        key = (len(self.visited), self.wumpus_dead)
+        if self.beliefs is None or self.beliefs[0] != key:
+            self.beliefs = (key, self.pit_probabilities(), self.wumpus_rooms())
+        return self.beliefs
+
+    def pit_probabilities(self):
+        """Pit probability of the cells the breezes sensed so far tell about.
+
+        Each breeze needs a pit in at least one of its unknown neighbors.
+        Breezes that share unknown cells form a component, whose pit
+        assignments are enumerated once, weighted by the pit prior, for the
+        marginals of all its cells. Any other unknown cell is independent
+        of them given the evidence, it keeps the prior and is left out. A
+        component of more than max_pit_cells cells is not enumerated, each
+        of its cells gets the posterior given its most telling breeze alone.
+        """
+        breezy = []
+        safe = set(self.visited)
+        for visited in self.visited:
+            if "breeze" in self.map[visited[0]][visited[1]]:
+                breezy.append(visited)
+            else:
+                safe.update(self.get_neighbors(visited))
+        safe.add(self.start)
+        probabilities = dict.fromkeys(safe, 0)
+
+        # group the breezes that share unknown cells, as split_components does
+        breezes = []
+        owner = {}
+        parent = []
+
+        def find(number):
+            while parent[number] != number:
+                parent[number] = parent[parent[number]]
+                number = parent[number]
+            return number
+
+        for visited in breezy:
+            unknown = [n for n in self.get_neighbors(visited) if n not in safe]
+            if not unknown:
+                continue
+            number = len(breezes)
+            breezes.append(unknown)
+            parent.append(number)
+            for neighbor in unknown:
+                if neighbor in owner:
+                    parent[find(number)] = find(owner[neighbor])
+                else:
+                    owner[neighbor] = number
+        components = {}
+        for number, unknown in enumerate(breezes):
+            components.setdefault(find(number), []).append(unknown)
+
+        p = self.pit_prior
+        for component in components.values():
+            frontier = list(dict.fromkeys(n for unknown in component for n in unknown))
+            if len(frontier) > self.max_pit_cells:
+                for unknown in component:
+                    # at least one pit among len(unknown) cells
+                    posterior = p / (1 - (1 - p) ** len(unknown))
+                    for neighbor in unknown:
+                        probabilities[neighbor] = max(
+                            probabilities.get(neighbor, 0), posterior
+                        )
+                continue
+            index = {cell: i for i, cell in enumerate(frontier)}
+            constraints = []
+            for unknown in component:
+                mask = 0
+                for neighbor in unknown:
+                    mask |= 1 << index[neighbor]
+                constraints.append(mask)
+            # weight of an assignment by its number of pits
+            weights = [
+                p**count * (1 - p) ** (len(frontier) - count)
+                for count in range(len(frontier) + 1)
+            ]
+            pit_weights = [0] * len(frontier)
+            total_weight = 0
+            for pits in range(1 << len(frontier)):
+                if all(pits & mask for mask in constraints):
+                    weight = weights[pits.bit_count()]
+                    total_weight += weight
+                    while pits:
+                        low = pits & -pits
+                        pit_weights[low.bit_length() - 1] += weight
+                        pits ^= low
+            for cell, pit_weight in zip(frontier, pit_weights):
+                probabilities[cell] = pit_weight / total_weight if total_weight else 0
+        return probabilities
+
+    def wumpus_rooms(self):
+        """(rooms, inside, probability) for the stenches sensed so far.
+
+        There is exactly one wumpus, placed uniformly away from the start,
+        so it is equally likely to be in any room that agrees with every
+        visited room's stench: probability for the rooms in rooms if inside,
+        or for the rooms not in rooms if not, and 0 elsewhere.
+        """
+        if self.wumpus_dead:
+            return set(), True, 0
+        # rooms ruled out: visited, the start and the neighbors of calm rooms
+        excluded = set(self.visited)
+        excluded.add(self.start)
+        stenchy = []
+        for visited in self.visited:
+            if "stench" in self.map[visited[0]][visited[1]]:
+                stenchy.append(visited)
+            else:
+                excluded.update(self.get_neighbors(visited))
+        if not stenchy:
+            return excluded, False, 1 / (self.max * self.max - len(excluded))
+        # the wumpus is next to every stench
+        candidates = set(self.get_neighbors(stenchy[0]))
+        for visited in stenchy[1:]:
+            candidates &= set(self.get_neighbors(visited))
+        candidates -= excluded
+        return candidates, True, 1 / len(candidates) if candidates else 0
+
 
 class KnowledgeBase:
-    def __init__(self):
+    def __init__(self, method="tt"):
+        # Told clauses in order, the kb is their conjunction
         self.kb = []
 
-        # Use seen clauses rather than searching kb due to recursion problems
-        self.seen_clauses = []
+        # "tt" counts models with truth tables, "dpll" decides entailment with
+        # SAT, "models" keeps the models of the kb up to date, see filter_models
+        self.method = method
+
+        # CNF of the kb for the dpll method, clauses are frozensets of
+        # literals, symbol id + 1 for a symbol and its negation for not
+        self.cnf = []
+
+        # Canonical keys of told clauses, see clause_key, for duplicate checks
+        self.seen_clauses = set()
+
+        # Bumped by tell for every new clause, older query results are stale
+        self.version = 0
 
-        # Tracks symbols in kb so tt_entails does not have to recalculate
+        # Least recently used query results keyed by (version, clause_key)
+        self.query_cache = OrderedDict()
+        self.cache_size = 4096
+
+        # For each symbol id the indexes of its clauses in kb, see propagate_units
+        self.symbol_index = {}
+
+        # Ids of the symbols in kb, in the order they were first told
         self.cached_symobls = []
 
-        # Visual indicator for model checking progress
+        # Inference counters, hooks are called as hook(event, info), see add_hook
+        self.stats = {
+            "asks": 0,
+            "tells": 0,
+            "models_checked": 0,
+            "models_sampled": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "ask_time": 0.0,
+        }
+        self.hooks = []
+
+        # Visual indicator for model checking progress, only shown on a terminal
         self.progress_bar = 0
         self.expected_maximum_checks = 1000000
+        self.show_progress = sys.stdout.isatty()
+        self.progress_interval = 0.25  # seconds between progress bar redraws
+        self.last_progress = 0.0
+
+        # Symbol ids for compiled programs, and the program of each kb clause.
+        # symbol_keys[id] is the symbol of an id, (kind, x, y) for symbols
+        # made by intern, which are their own id in formulas
+        self.symbol_ids = {}
+        self.symbol_keys = []
+        self.programs = []
+
+        # Number of symbols enumerated together as one block of models
+        self.block_bits = 16
+
+        # Per ask budget, an enumeration of more models than model_budget,
+        # or one still running after half of time_budget seconds, is
+        # replaced by an estimate from about samples sampled kb models, see
+        # tt_sample_all. Enumerating 2^28 models of a few dozen clauses
+        # takes about 0.3 s, where sampling them takes longer, the budget
+        # is where the two cost about the same.
+        self.model_budget = 1 << 28
+        self.time_budget = 1.0
+        self.samples = 1 << 16
+        self.gibbs_sweeps = 20
+        self.gibbs_block = 4
+        self.rng = random.Random(0)
+
+        # Models of the kb for the "models" method, a bitset where bit m is
+        # the model whose bit i is the value of model_symbols[i], and
+        # model_columns[i] the models where model_symbols[i] is true. Symbols
+        # every model agrees on are moved to fixed_values. With more than
+        # max_model_symbols open symbols models is None and asks enumerate
+        self.models = 1
+        self.model_symbols = []
+        self.model_columns = []
+        self.fixed_values = {}
+        self.max_model_symbols = 24
 
     def tell(self, clause):
         """Add a clause in propositional logic to the KB."""
-        if clause in self.seen_clauses:
+        self.stats["tells"] += 1
+        key = self.clause_key(clause)
+        if key in self.seen_clauses:
             return
         else:
-            self.seen_clauses.append(clause)
-        if not self.kb:
-            self.kb.append(clause)
-        else:
-            self.kb = [clause, "and"] + [self.kb]
-        self.cached_symobls = self.get_symbols(self.kb)
+            self.seen_clauses.add(key)
+        self.kb.append(clause)
+        self.programs.append(self.compile(clause))
+        self.version += 1
+
+        # only the new clause can bring new symbols
+        for symbol in dict.fromkeys(op for op in self.programs[-1] if op >= 0):
+            if symbol not in self.symbol_index:
+                self.symbol_index[symbol] = []
+                self.cached_symobls.append(symbol)
+            self.symbol_index[symbol].append(len(self.kb) - 1)
+        if self.method == "dpll":
+            self.cnf.extend(self.to_cnf(clause))
+        elif self.method == "models" and self.models is not None:
+            self.filter_models(self.programs[-1])
+        for hook in self.hooks:
+            hook("tell", {"clause": clause, "version": self.version})
+
+    def add_hook(self, hook):
+        """Call hook(event, info) after every new clause ("tell") and every query ("ask")"""
+        self.hooks.append(hook)
+
+    def clause_key(self, clause):
+        """Hashable form of a clause, equal for equal clauses"""
+        if isinstance(clause, list):
+            return tuple(self.clause_key(part) for part in clause)
+        return clause
+
+    def clauses_with(self, symbol):
+        """Told clauses that mention symbol"""
+        if not isinstance(symbol, int):
+            symbol = self.symbol_ids.get(symbol)
+        return [self.kb[i] for i in self.symbol_index.get(symbol, [])]
 
     def ask(self, alpha):
         """Query the KB to see if alpha is entailed by the KB."""
+        return self.ask_all([alpha])[0]
+
+    def ask_all(self, alphas):
+        """Query the KB for every formula in alphas, returns the results in order.
+
+        With the tt method all the queries share one enumeration of the models.
+        """
+        return [estimate for estimate, low, high in self.ask_bounds(alphas)]
+
+    def ask_bounds(self, alphas):
+        """Like ask_all, with the 95% confidence bounds of each result.
+
+        Returns (result, low, high) for each formula in alphas, exact
+        results have low == high == result.
+        """
         self.progress_bar = 0
-        print("\rAsking", alpha)
-        result = self.tt_entails(self.kb, alpha)
-        print(f"\n")
-        return result
+        if self.show_progress:
+            print("\rAsking", self.named(alphas if len(alphas) > 1 else alphas[0]))
+        start = time.perf_counter()
+        checked = self.stats["models_checked"]
+        results = self.answer(alphas)
+        elapsed = time.perf_counter() - start
+        if self.show_progress:
+            print(f"\n")
+
+        self.stats["asks"] += 1
+        self.stats["ask_time"] += elapsed
+        for hook in self.hooks:
+            hook(
+                "ask",
+                {
+                    "queries": alphas,
+                    "results": [result[0] for result in results],
+                    "bounds": [result[1:] for result in results],
+                    "time": elapsed,
+                    "models_checked": self.stats["models_checked"] - checked,
+                },
+            )
+        return results
+
+    def answer(self, alphas):
+        """(result, low, high) for alphas, from the query cache when the KB has not changed since"""
+        keys = [(self.version, self.clause_key(alpha)) for alpha in alphas]
+        missing = {}
+        for key, alpha in zip(keys, alphas):
+            if key in self.query_cache:
+                self.query_cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+            elif key not in missing:
+                missing[key] = alpha
+                self.stats["cache_misses"] += 1
+
+        if self.method == "dpll":
+            results = [self.dpll_entails(alpha) for alpha in missing.values()]
+            results = [(result, result, result) for result in results]
+        elif self.method == "models" and self.models is not None:
+            results = [self.models_bounds(alpha) for alpha in missing.values()]
+        elif missing:
+            results = self.tt_bounds_all(self.kb, list(missing.values()))
+        else:
+            results = []
+        for key, result in zip(missing, results):
+            self.query_cache[key] = result
+        answers = [self.query_cache[key] for key in keys]
+        while len(self.query_cache) > self.cache_size:
+            self.query_cache.popitem(last=False)
+        return answers
 
     def tt_entails(self, kb, alpha):
         """Check all models to determine if kb entails alpha."""
-        symbols = self.cached_symobls + self.get_symbols(alpha)
-        # print("--------- all truth tables ---------")
-        # self.tt_enumerate(symbols, [])
-        # print("---------   check tables   ---------")
-        true_counts, total_counts = self.tt_check_all(symbols, [], kb, alpha)
-        if total_counts == 0:
-            return 0
-        return true_counts / total_counts
+        return self.tt_entails_all(kb, [alpha])[0]
 
-    def tt_check_all(self, symbols, model, kb, alpha):
-        """Recursively check all possible models."""
-        self.update_progress_bar()
-        if len(symbols) == 0:
-            if self.is_true(kb, model):
-                if self.is_true(alpha, model):
-                    # alpha true, kb true
-                    return 1, 1
-                # alpha false, kb true
-                return 0, 1
-            else:
-                # alpha false, kb false
-                return 0, 0
+    def tt_entails_all(self, kb, alphas):
+        """Check all models to determine if kb entails each of alphas."""
+        return [estimate for estimate, low, high in self.tt_bounds_all(kb, alphas)]
+
+    def tt_bounds_all(self, kb, alphas):
+        """Results of tt_entails_all as (result, low, high), see ask_bounds.
+
+        Symbols forced by the clauses are fixed first, see propagate_units.
+        Clauses that share no free symbol constrain independent parts of a
+        model, see split_components. Only the components that a query
+        mentions are enumerated together with it, every other component
+        just needs a model, as it scales the kb models and the query models
+        alike. A component too large for the budget is assumed to have one.
+        """
+        deadline = exact_deadline = None
+        if self.time_budget is not None:
+            # an enumeration that takes more than half of the budget leaves
+            # the rest to sampling
+            exact_deadline = time.perf_counter() + self.time_budget / 2
+            deadline = exact_deadline + self.time_budget / 2
+        if kb is self.kb:
+            programs = self.programs
         else:
-            p = symbols[0]
-            rest = list(symbols[1 : len(symbols)])
+            programs = [self.compile(clause) for clause in kb]
+        alpha_programs = [self.compile(alpha) for alpha in alphas]
+        propagated = self.propagate_units(
+            programs, self.symbol_index if kb is self.kb else None
+        )
+        if propagated is None:
+            # an inconsistent kb has no models, whatever the query
+            return [(0, 0, 0)] * len(alphas)
+        values, programs = propagated
+        component_of, components = self.split_components(programs, values)
+
+        # queries about the same components share one enumeration
+        groups = {}
+        for i, program in enumerate(alpha_programs):
+            key = sorted({component_of[op] for op in program if op in component_of})
+            groups.setdefault(tuple(key), []).append(i)
+
+        has_models = {}
+        results = [(0, 0, 0)] * len(alphas)
+        for key, indexes in groups.items():
+            symbols = []
+            group_programs = []
+            for number in key:
+                symbols.extend(components[number][0])
+                group_programs.extend(components[number][1])
+            # a symbol listed twice would be enumerated twice, keep the first one
+            for i in indexes:
+                symbols.extend(
+                    op for op in alpha_programs[i] if op >= 0 and op not in values
+                )
+            symbols = list(dict.fromkeys(symbols))
+            # print("--------- all truth tables ---------")
+            # self.tt_enumerate(symbols, [])
+            # print("---------   check tables   ---------")
+            group_alphas = [alpha_programs[i] for i in indexes]
+            counts = None
+            if self.model_budget is None or 1 << len(symbols) <= self.model_budget:
+                counts = self.tt_check_all(
+                    symbols, group_programs, group_alphas, values, exact_deadline
+                )
+            if counts is None:
+                # over budget, estimate the same ratio from sampled kb models
+                true_counts, total_counts = self.tt_sample_all(
+                    symbols, group_programs, group_alphas, values, deadline
+                )
+                group_results = []
+                for true_count in true_counts:
+                    low, high = self.confidence_bounds(true_count, total_counts)
+                    estimate = true_count / total_counts if total_counts else 0.5
+                    group_results.append((estimate, low, high))
+            else:
+                true_counts, total_counts = counts
+                if total_counts == 0:
+                    continue
+                group_results = [
+                    (true_count / total_counts,) * 3 for true_count in true_counts
+                ]
+            # every other component needs a model too
+            for number in range(len(components)):
+                if number not in key and number not in has_models:
+                    component_symbols, component_programs = components[number]
+                    if (
+                        self.model_budget is None
+                        or 1 << len(component_symbols) <= self.model_budget
+                    ):
+                        counts = self.tt_check_all(
+                            component_symbols, component_programs, [], values
+                        )
+                        has_models[number] = counts[1] > 0
+                    else:
+                        # too large to check, assumed to have one
+                        has_models[number] = True
+            if all(has_models.get(number, True) for number in range(len(components))):
+                for i, result in zip(indexes, group_results):
+                    results[i] = result
+        return results
 
-            self.progress_bar += 1
+    def tt_sample_all(
+        self, symbols, programs, alpha_programs, values=(), deadline=None
+    ):
+        """Sampling version of tt_check_all.
 
-            true1, total1 = self.tt_check_all(rest, model + [(p, True)], kb, alpha)
-            true2, total2 = self.tt_check_all(rest, model + [(p, False)], kb, alpha)
-            return true1 + true2, total1 + total2
+        Uniform random models would almost never satisfy a large kb, so
+        every bit of a block of columns runs its own Gibbs sampler over the
+        kb models. gibbs_sweeps times, the symbols of each clause, at most
+        gibbs_block at a time, are redrawn together uniformly among the
+        values that keep all their clauses true, see gibbs_update. Moving
+        symbols together lets a model reach others that differ from it in
+        more than one symbol, like the rooms of the one wumpus. The models
+        of the block that satisfy every clause afterwards are counted.
+        Rounds of samplers are run until samples kb models are counted or
+        8 * samples models are drawn. The first round is a small one, and
+        with a deadline every later one is cut to the number of samplers
+        that the time left allows at the pace of the rounds so far. A round
+        still running at the deadline is dropped, so the counts can be 0.
+        """
+        occurrences = {symbol: [] for symbol in symbols}
+        for i, program in enumerate(programs):
+            for symbol in {op for op in program if op >= 0}:
+                if symbol in occurrences:
+                    occurrences[symbol].append(i)
+        # the symbols redrawn together, with the clauses they are in
+        blocks = {}
+        for program in programs:
+            program_symbols = [op for op in dict.fromkeys(program) if op in occurrences]
+            for i in range(0, len(program_symbols), self.gibbs_block):
+                block = tuple(sorted(program_symbols[i : i + self.gibbs_block]))
+                if block not in blocks:
+                    indexes = sorted({j for s in block for j in occurrences[s]})
+                    blocks[block] = [programs[j] for j in indexes]
 
-    def is_true(self, prop, model):
-        """Check whether prop is true in model"""
-        if isinstance(prop, str):
-            return (prop, True) in model
+        true_counts = [0] * len(alpha_programs)
+        total_counts = 0
+        drawn = 0
+        spent = 0.0
+        run = self.run_program
+        size = 1 << min(self.block_bits, 10)
+        while total_counts < self.samples and drawn < 8 * self.samples:
+            start = time.perf_counter()
+            full = (1 << size) - 1
+            columns = [0] * len(self.symbol_keys)
+            for symbol in values:
+                if values[symbol]:
+                    columns[symbol] = full
+            for symbol in symbols:
+                columns[symbol] = self.rng.getrandbits(size)
+            for _ in range(self.gibbs_sweeps):
+                for block, block_programs in blocks.items():
+                    if deadline is not None and time.perf_counter() > deadline:
+                        self.stats["models_sampled"] += drawn
+                        return true_counts, total_counts
+                    self.gibbs_update(block, block_programs, columns, full)
+            drawn += size
+
+            kb_models = full
+            for program in programs:
+                kb_models &= run(program, columns, full)
+                if not kb_models:
+                    break
+            if kb_models:
+                total_counts += kb_models.bit_count()
+                for i, program in enumerate(alpha_programs):
+                    true_counts[i] += (
+                        kb_models & run(program, columns, full)
+                    ).bit_count()
+
+            spent += time.perf_counter() - start
+            size = 1 << self.block_bits
+            if deadline is not None:
+                # samplers that fit in the time left at the pace so far
+                size = min(size, int((deadline - time.perf_counter()) * drawn / spent))
+                if size < 64:
+                    break
+        self.stats["models_sampled"] += drawn
+        return true_counts, total_counts
+
+    def gibbs_update(self, block, programs, columns, full):
+        """Redraw the columns of the symbols in block, one step of tt_sample_all.
+
+        Each model of the columns gets one of the assignments of block that
+        keep every one of programs true, uniformly: an assignment drawn at
+        random is kept where it is allowed and drawn again elsewhere. A
+        model with no allowed assignment, or still undecided after a few
+        draws, keeps its values. The models with the same values outside
+        block share their allowed assignments and their chance to keep
+        their values, so uniform kb models stay uniform.
+        """
+        old = [columns[symbol] for symbol in block]
+        allowed = []
+        for assignment in range(1 << len(block)):
+            for i, symbol in enumerate(block):
+                columns[symbol] = full if assignment >> i & 1 else 0
+            models = full
+            for program in programs:
+                models &= self.run_program(program, columns, full)
+            allowed.append(models)
+
+        # models with a single allowed assignment take it, the others draw
+        new = [0] * len(block)
+        allowed_any = undecided = 0
+        for models in allowed:
+            undecided |= allowed_any & models
+            allowed_any |= models
+        for assignment, models in enumerate(allowed):
+            for i in range(len(block)):
+                if assignment >> i & 1:
+                    new[i] |= models & ~undecided
+        for _ in range(1 << len(block)):
+            if not undecided:
+                break
+            draws = [self.rng.getrandbits(full.bit_length()) for _ in block]
+            for assignment, models in enumerate(allowed):
+                # the models that drew this assignment
+                for i, draw in enumerate(draws):
+                    models &= draw if assignment >> i & 1 else ~draw
+                models &= undecided
+                if models:
+                    undecided &= ~models
+                    for i in range(len(block)):
+                        if assignment >> i & 1:
+                            new[i] |= models
+        # the rest keep their values
+        keep = full & ~allowed_any | undecided
+        for i, symbol in enumerate(block):
+            columns[symbol] = new[i] | (old[i] & keep)
+
+    def confidence_bounds(self, successes, trials, z=1.96):
+        """Wilson score interval of a ratio estimated from trials samples"""
+        if trials == 0:
+            return 0.0, 1.0
+        ratio = successes / trials
+        scale = 1 + z * z / trials
+        centre = (ratio + z * z / (2 * trials)) / scale
+        spread = (
+            z
+            * math.sqrt(ratio * (1 - ratio) / trials + z * z / (4 * trials * trials))
+            / scale
+        )
+        return max(0.0, centre - spread), min(1.0, centre + spread)
+
+    def filter_models(self, program):
+        """Drop the models where a new clause is false, for the "models" method.
+
+        The bitset only doubles for symbols the clause brings, and a symbol
+        that the models then agree on is fixed and removed again, so a unit
+        clause never grows it.
+        """
+        for symbol in dict.fromkeys(op for op in program if op >= 0):
+            if symbol in self.fixed_values or symbol in self.model_symbols:
+                continue
+            if len(self.model_symbols) == self.max_model_symbols:
+                # too many open symbols, asks go back to enumeration
+                self.models = None
+                return
+            self.add_model_symbol(symbol)
+        models, columns, full = self.model_space([])
+        self.models = models & self.run_program(program, columns, full)
+        if not self.models:
+            return  # inconsistent
+        for i in reversed(range(len(self.model_symbols))):
+            column = self.model_columns[i]
+            if not self.models & column:
+                self.fix_model_symbol(i, False)
+            elif not self.models & ~column:
+                self.fix_model_symbol(i, True)
+
+    def add_model_symbol(self, symbol):
+        """Add an open symbol to models, both of its values stay possible"""
+        size = 1 << len(self.model_symbols)
+        self.models |= self.models << size
+        self.model_columns = [
+            column | (column << size) for column in self.model_columns
+        ]
+        self.model_columns.append(((1 << size) - 1) << size)
+        self.model_symbols.append(symbol)
+
+    def fix_model_symbol(self, i, value):
+        """Keep the models where model_symbols[i] has value and remove the symbol"""
+        top = len(self.model_symbols) - 1
+        half = 1 << top
+        low = (1 << half) - 1
+        self.fixed_values[self.model_symbols[i]] = value
+        if i != top:
+            # delta swap of symbols i and top: model m with bit i set and the
+            # top bit clear trades places with m - 2^i + 2^top
+            distance = half - (1 << i)
+            swap = (
+                ((self.models >> distance) ^ self.models) & self.model_columns[i] & low
+            )
+            self.models ^= swap | (swap << distance)
+            self.model_symbols[i] = self.model_symbols[top]
+        self.models = self.models >> half if value else self.models & low
+        self.model_symbols.pop()
+        self.model_columns.pop()
+        self.model_columns = [column & low for column in self.model_columns]
+
+    def model_space(self, extra):
+        """models extended with the free symbols extra, the columns of every symbol by id and the full column"""
+        models = self.models
+        columns = [0] * len(self.symbol_keys)
+        for symbol, column in zip(self.model_symbols, self.model_columns):
+            columns[symbol] = column
+        size = 1 << len(self.model_symbols)
+        for symbol in extra:
+            models |= models << size
+            for other in self.model_symbols + extra:
+                columns[other] |= columns[other] << size
+            columns[symbol] = ((1 << size) - 1) << size
+            size = size << 1
+        full = (1 << size) - 1
+        for symbol, value in self.fixed_values.items():
+            if value:
+                columns[symbol] = full
+        return models, columns, full
+
+    def models_bounds(self, alpha):
+        """Result of alpha from the models of the "models" method, as ask_bounds"""
+        program = self.compile(alpha)
+        extra = [
+            op
+            for op in dict.fromkeys(program)
+            if op >= 0 and op not in self.fixed_values and op not in self.model_symbols
+        ]
+        if len(self.model_symbols) + len(extra) > self.max_model_symbols:
+            return self.tt_bounds_all(self.kb, [alpha])[0]
+        models, columns, full = self.model_space(extra)
+        self.stats["models_checked"] += full.bit_length()
+        total = models.bit_count()
+        if total == 0:
+            return 0, 0, 0
+        result = (models & self.run_program(program, columns, full)).bit_count() / total
+        return result, result, result
+
+    def propagate_units(self, programs, occurrences=None):
+        """Fix the symbols that the compiled clauses force.
+
+        A clause with a single unfixed symbol is run on the two values of
+        that symbol. If only one satisfies it the symbol is fixed, which can
+        force a symbol in the other clauses that mention it. occurrences
+        maps each symbol id to the indexes of its programs, symbol_index for
+        the programs of the kb, and is built when not given. Returns the
+        fixed values by symbol id and the clauses not yet satisfied by them,
+        or None when the clauses contradict each other.
+        """
+        values = {}
+        columns = [0] * len(self.symbol_keys)
+        symbols = [{op for op in program if op >= 0} for program in programs]
+        if occurrences is None:
+            occurrences = {}
+            for i, program_symbols in enumerate(symbols):
+                for symbol in program_symbols:
+                    occurrences.setdefault(symbol, []).append(i)
+        settled = [False] * len(programs)
+        pending = list(range(len(programs)))
+        while pending:
+            i = pending.pop()
+            if settled[i]:
+                continue
+            free = [symbol for symbol in symbols[i] if symbol not in values]
+            if len(free) > 1:
+                continue
+            # a block of two models, the free symbol is false in bit 0 and
+            # true in bit 1, fixed symbols are constant columns
+            if free:
+                columns[free[0]] = 2
+            result = self.run_program(programs[i], columns, 3)
+            if result == 0:
+                return None
+            settled[i] = True
+            if result != 3:
+                symbol = free[0]
+                values[symbol] = result == 2
+                columns[symbol] = 3 if values[symbol] else 0
+                pending.extend(occurrences[symbol])
+            elif free:
+                columns[free[0]] = 0
+        return values, [program for i, program in enumerate(programs) if not settled[i]]
+
+    def split_components(self, programs, values=()):
+        """Group compiled clauses into components that share no free symbol.
+
+        Symbols in values are fixed, they do not link clauses. Returns a
+        dict from each free symbol id to the number of its component and the
+        list of components as (symbol ids, programs). A clause without free
+        symbols is a component of its own.
+        """
+        parent = {}
+
+        def find(symbol):
+            while parent[symbol] != symbol:
+                parent[symbol] = parent[parent[symbol]]
+                symbol = parent[symbol]
+            return symbol
+
+        for program in programs:
+            root = None
+            for op in program:
+                if op < 0 or op in values:
+                    continue
+                if op not in parent:
+                    parent[op] = op
+                if root is None:
+                    root = find(op)
+                else:
+                    other = find(op)
+                    if other != root:
+                        parent[other] = root
+
+        component_of = {}
+        components = []
+        numbers = {}
+        for program in programs:
+            symbols = [op for op in program if op >= 0 and op not in values]
+            if not symbols:
+                components.append(([], [program]))
+                continue
+            root = find(symbols[0])
+            if root not in numbers:
+                numbers[root] = len(components)
+                components.append(([], []))
+            number = numbers[root]
+            components[number][1].append(program)
+            for symbol in symbols:
+                if symbol not in component_of:
+                    component_of[symbol] = number
+                    components[number][0].append(symbol)
+        return component_of, components
+
+    def tt_check_all(self, symbols, programs, alpha_programs, values=(), deadline=None):
+        """Check all possible models of the compiled kb clauses, one block of models at a time.
+
+        symbols are the ids of the symbols to enumerate, values the fixed
+        value of other symbols by id. Returns the number of kb models where
+        each of alpha_programs holds, and the number of kb models, or None
+        if time.perf_counter() passes deadline first.
+
+        A model is an integer whose bit i is the value of symbols[i]. The
+        first block_bits symbols vary inside a block, so each of them is
+        represented by a column: an integer with one bit per model of the
+        block. The remaining symbols are constant within a block. Running a
+        program over columns evaluates it in every model of the block at once.
+        """
+        low = min(len(symbols), self.block_bits)
+        size = 1 << low
+        full = (1 << size) - 1
+        low_columns = [0] * len(self.symbol_keys)
+        for symbol in values:
+            if values[symbol]:
+                low_columns[symbol] = full
+        for i, symbol in enumerate(symbols[:low]):
+            # repeating unit of 2^i zeros followed by 2^i ones
+            half = 1 << i
+            unit = ((1 << half) - 1) << half
+            low_columns[symbol] = unit * (full // ((1 << (2 * half)) - 1))
+
+        true_counts = [0] * len(alpha_programs)
+        total_counts = 0
+        high = symbols[low:]
+        run = self.run_program
+        for block in range(1 << len(high)):
+            columns = list(low_columns)
+            for i, symbol in enumerate(high):
+                columns[symbol] = full if (block >> i) & 1 else 0
+
+            if self.show_progress:
+                self.update_progress_bar()
+            self.progress_bar += size
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            self.stats["models_checked"] += size
+
+            kb_models = full
+            for program in programs:
+                kb_models &= run(program, columns, full)
+                if not kb_models:
+                    break
+            if kb_models:
+                total_counts += kb_models.bit_count()
+                for i, program in enumerate(alpha_programs):
+                    true_counts[i] += (
+                        kb_models & run(program, columns, full)
+                    ).bit_count()
+        return true_counts, total_counts
+
+    def symbol_id(self, symbol):
+        """Dense integer id of symbol, interned on first use"""
+        if isinstance(symbol, int):
+            if not 0 <= symbol < len(self.symbol_keys):
+                raise ValueError("symbol id %d was never interned" % symbol)
+            return symbol
+        if symbol not in self.symbol_ids:
+            self.symbol_ids[symbol] = len(self.symbol_keys)
+            self.symbol_keys.append(symbol)
+        return self.symbol_ids[symbol]
+
+    def intern(self, kind, x, y):
+        """Integer symbol for the proposition kind at (x, y), e.g. a pit"""
+        return self.symbol_id((kind, x, y))
+
+    def symbol_name(self, symbol):
+        """Readable name of a symbol, for debugging"""
+        if isinstance(symbol, int):
+            symbol = self.symbol_keys[symbol]
+        if isinstance(symbol, tuple):
+            return "%s%d,%d" % symbol
+        return symbol
+
+    def named(self, prop):
+        """prop with its integer symbols replaced by their names"""
+        if isinstance(prop, list):
+            return [self.named(part) for part in prop]
+        if isinstance(prop, int):
+            return self.symbol_name(prop)
+        return prop
+
+    def compile(self, prop):
+        """Compile prop to a postfix program, see run_program.
+
+        Symbols become their non-negative ids and operators the negative
+        OP_ codes, so running a program needs no recursion and no string
+        comparisons.
+        """
+        program = []
+        stack = [(prop, False)]
+        while stack:
+            prop, operands_done = stack.pop()
+            if isinstance(prop, (str, int)):
+                program.append(self.symbol_id(prop))
+            elif len(prop) == 0:
+                program.append(OP_TRUE)
+            elif len(prop) == 1:
+                stack.append((prop[0], False))
+            elif prop[0] == "not":
+                if operands_done:
+                    program.append(OP_NOT)
+                else:
+                    stack.append((prop, True))
+                    stack.append((prop[1], False))
+            elif prop[1] in OPCODES:
+                if operands_done:
+                    program.append(OPCODES[prop[1]])
+                else:
+                    stack.append((prop, True))
+                    stack.append((prop[2], False))
+                    stack.append((prop[0], False))
+            else:
+                program.append(OP_FALSE)
+        return program
+
+    def run_program(self, program, columns, full):
+        """Run a compiled program over a block, returns the column of models where it holds"""
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for op in program:
+            if op >= 0:
+                push(columns[op])
+            elif op == OP_NOT:
+                push(full ^ pop())
+            elif op == OP_AND:
+                push(pop() & pop())
+            elif op == OP_OR:
+                push(pop() | pop())
+            elif op == OP_IMPLIES:
+                right = pop()
+                push((full ^ pop()) | right)
+            elif op == OP_IFF:
+                push(full ^ pop() ^ pop())
+            elif op == OP_TRUE:
+                push(full)
+            else:
+                push(0)
+        return stack[0]
+
+    def dpll_entails(self, alpha):
+        """Decide entailment with the SAT solver.
+
+        Returns 1 if the kb entails alpha, 0 if it entails not alpha (or is
+        inconsistent) and 0.5 when alpha is undecided by the kb.
+        """
+        if not SatSolver(self.cnf + self.to_cnf(alpha)).solve():
+            return 0
+        if not SatSolver(self.cnf + self.to_cnf(alpha, negate=True)).solve():
+            return 1
+        return 0.5
+
+    def to_cnf(self, prop, negate=False):
+        """Convert prop (or not prop) to a list of clauses over integer literals"""
+        if isinstance(prop, (str, int)):
+            literal = self.symbol_id(prop) + 1
+            return [frozenset([-literal if negate else literal])]
+        elif len(prop) == 0:
+            return [frozenset()] if negate else []
         elif len(prop) == 1:
-            return self.is_true(prop[0], model)
+            return self.to_cnf(prop[0], negate)
         elif prop[0] == "not":
-            return not self.is_true(prop[1], model)
+            return self.to_cnf(prop[1], not negate)
         elif prop[1] == "and":
-            return self.is_true(prop[0], model) and self.is_true(prop[2], model)
+            if negate:
+                return self.distribute(
+                    self.to_cnf(prop[0], True), self.to_cnf(prop[2], True)
+                )
+            return self.to_cnf(prop[0]) + self.to_cnf(prop[2])
         elif prop[1] == "or":
-            return self.is_true(prop[0], model) or self.is_true(prop[2], model)
+            if negate:
+                return self.to_cnf(prop[0], True) + self.to_cnf(prop[2], True)
+            return self.distribute(self.to_cnf(prop[0]), self.to_cnf(prop[2]))
         elif prop[1] == "implies":
-            return (not self.is_true(prop[0], model)) or self.is_true(prop[2], model)
+            if negate:
+                return self.to_cnf(prop[0]) + self.to_cnf(prop[2], True)
+            return self.distribute(self.to_cnf(prop[0], True), self.to_cnf(prop[2]))
         elif prop[1] == "iff":
-            left = (not self.is_true(prop[0], model)) or self.is_true(prop[2], model)
-            right = (not self.is_true(prop[2], model)) or self.is_true(prop[0], model)
-            return left and right
-        return False
-
-    def get_symbols(self, clauses):
-        """Extract all unique symbols from the KB."""
-        symbols = set()
-        for clause in clauses:
-            self.extract_symbols(clause, symbols)
-        return list(symbols)
-
-    def extract_symbols(self, clause, symbols):
-        """Helper to extract symbols from a clause."""
-        if isinstance(clause, str) and not self.is_operator(clause):
-            symbols.add(clause)
-        elif isinstance(clause, list):
-            for part in clause:
-                self.extract_symbols(part, symbols)
-
-    def is_operator(self, item):
-        """Check if the item is a logical operator."""
-        return item in ["not", "and", "or", "implies", "iff"]
+            # a iff b is (a or not b) and (not a or b), its negation (a or b) and (not a or not b)
+            return self.distribute(
+                self.to_cnf(prop[0]), self.to_cnf(prop[2], not negate)
+            ) + self.distribute(
+                self.to_cnf(prop[0], True), self.to_cnf(prop[2], negate)
+            )
+        # anything else is false, see compile
+        return [] if negate else [frozenset()]
+
+    def distribute(self, left, right):
+        """Disjunction of two CNFs, dropping tautological clauses"""
+        clauses = []
+        for a in left:
+            for b in right:
+                clause = a | b
+                if not any(-literal in clause for literal in clause):
+                    clauses.append(clause)
+        return clauses
+
+    def is_true(self, prop, model):
+        """Check whether prop is true in model, a list of (symbol, value) pairs"""
+        program = self.compile(prop)
+        true_symbols = [self.symbol_id(symbol) for symbol, value in model if value]
+        # a model is a block of one model, 1 for the symbols set to True
+        columns = [0] * len(self.symbol_keys)
+        for symbol in true_symbols:
+            columns[symbol] = 1
+        return self.run_program(program, columns, 1) == 1
 
     def update_progress_bar(self):
-        """Prints a simple progress bar based on the model check count, capped at maximum."""
+        """Prints a simple progress bar based on the model check count, capped at maximum.
+
+        Redraws at most once every progress_interval seconds.
+        """
+        now = time.monotonic()
+        if now - self.last_progress < self.progress_interval:
+            return
+        self.last_progress = now
         total_bar_length = 100
 
         filled_length = int(
@@ -341,3 +1373,172 @@ class KnowledgeBase:
             self.tt_enumerate(rest, model + [(p, True)])
             self.tt_enumerate(rest, model + [(p, False)])
             return
+
+
+class SatSolver:
+    """CDCL satisfiability solver over clauses of nonzero integer literals.
+
+    Pure literals are eliminated up front, then the search decides,
+    propagates units through two watched literals per clause and learns a
+    first-UIP clause from every conflict.
+    """
+
+    def __init__(self, clauses):
+        self.clauses = []
+        self.unsat = False
+        units = []
+        for clause in self.eliminate_pure_literals(set(clauses)):
+            if not clause:
+                self.unsat = True
+            elif len(clause) == 1:
+                units.extend(clause)
+            else:
+                self.clauses.append(list(clause))
+
+        self.value = {}  # var -> True/False
+        self.level = {}
+        self.reason = {}
+        self.activity = {}
+        self.trail = []
+        self.trail_lim = []
+        self.watches = {}
+        for i, clause in enumerate(self.clauses):
+            self.watch(clause[0], i)
+            self.watch(clause[1], i)
+            for literal in clause:
+                self.activity[abs(literal)] = 0
+        for literal in units:
+            self.activity.setdefault(abs(literal), 0)
+            if self.literal_value(literal) is False:
+                self.unsat = True
+            elif self.literal_value(literal) is None:
+                self.assign(literal, None)
+
+    def eliminate_pure_literals(self, clauses):
+        """Drop clauses satisfied by a literal whose negation appears nowhere"""
+        while True:
+            literals = set()
+            for clause in clauses:
+                literals |= clause
+            pure = {literal for literal in literals if -literal not in literals}
+            if not pure:
+                return clauses
+            clauses = {clause for clause in clauses if not clause & pure}
+
+    def watch(self, literal, index):
+        self.watches.setdefault(literal, []).append(index)
+
+    def literal_value(self, literal):
+        value = self.value.get(abs(literal))
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.value[var] = literal > 0
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self, head):
+        """Unit propagation from trail[head:], returns a conflicting clause index or None"""
+        while head < len(self.trail):
+            false_literal = -self.trail[head]
+            head += 1
+            watching = self.watches.get(false_literal, [])
+            i = 0
+            while i < len(watching):
+                index = watching[i]
+                clause = self.clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.literal_value(clause[0]) is True:
+                    i += 1
+                    continue
+                for k in range(2, len(clause)):
+                    if self.literal_value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watch(clause[1], index)
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    if self.literal_value(clause[0]) is False:
+                        return index
+                    self.assign(clause[0], index)
+                    i += 1
+        return None
+
+    def analyze(self, conflict):
+        """First-UIP conflict analysis, returns the learnt clause and backjump level"""
+        current = len(self.trail_lim)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in clause:
+                var = abs(other)
+                if other == literal or var in seen or self.level[var] == 0:
+                    continue
+                seen.add(var)
+                self.activity[var] += 1
+                if self.level[var] == current:
+                    pending += 1
+                else:
+                    learnt.append(other)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reason[abs(literal)]]
+        learnt[0] = -literal
+        backjump = 0
+        for i in range(1, len(learnt)):
+            if self.level[abs(learnt[i])] > backjump:
+                backjump = self.level[abs(learnt[i])]
+                learnt[1], learnt[i] = learnt[i], learnt[1]
+        return learnt, backjump
+
+    def backtrack(self, level):
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            del self.value[abs(literal)]
+        del self.trail[start:]
+        del self.trail_lim[level:]
+
+    def solve(self):
+        """Returns True if the clauses are satisfiable"""
+        if self.unsat:
+            return False
+        head = 0
+        while True:
+            conflict = self.propagate(head)
+            head = len(self.trail)
+            if conflict is not None:
+                if not self.trail_lim:
+                    return False
+                learnt, backjump = self.analyze(conflict)
+                self.backtrack(backjump)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.clauses.append(learnt)
+                    self.watch(learnt[0], len(self.clauses) - 1)
+                    self.watch(learnt[1], len(self.clauses) - 1)
+                    self.assign(learnt[0], len(self.clauses) - 1)
+                head = len(self.trail) - 1
+                continue
+            free = [var for var in self.activity if var not in self.value]
+            if not free:
+                return True
+            var = max(free, key=self.activity.get)
+            self.trail_lim.append(len(self.trail))
+            # most cells hold nothing, try false first
+            self.assign(-var, None)
@@ -0,0 +1,228 @@
+# Wumpus World - Benchmarks
+#
+# Times the hot paths of the agent and the simulation on fixed-seed worlds:
+# KnowledgeBase.tell, KnowledgeBase.ask, Simulation.agent_move, whole
+# episodes and bulk world generation. Results are printed as JSON so that
+# runs on two commits can be diffed, see main for the command-line options.
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from wwsim import *
+from wwenv import VectorSimulation
+
+# Worlds used by every benchmark, change them and the numbers are not comparable
+FIXTURE_SEEDS = list(range(20))
+
+
+def canned_kbs(seeds, max_symbols=16):
+    """KB states from real episodes.
+
+    Plays each seeded world with the frontier agent, which tells its KB the
+    same clauses as the kb agent does, and keeps the last state with at most
+    max_symbols symbols: the told clauses, the safety queries for the
+    cells next to the agent and the symbols the clauses are interned from.
+    """
+    states = []
+    for seed in seeds:
+        sim = Simulation(
+            ROWS, COLUMNS, 0, seed=seed, verbose=False, inference="frontier"
+        )
+        sim.generate_simulation()
+        state = None
+        moves = 0
+        while not sim.terminal_test() and not sim.endEpisode and moves < 200:
+            sim.move()
+            moves = moves + 1
+            agent = sim.get_agent()
+            if len(agent.kb.cached_symobls) > max_symbols:
+                break
+            queries = [
+                agent.safe_query(cell) for cell in agent.get_neighbors(agent.position)
+            ]
+            state = {
+                "seed": seed,
+                "symbols": list(agent.kb.symbol_keys),
+                "clauses": list(agent.kb.kb),
+                "queries": queries,
+            }
+        if state:
+            states.append(state)
+    return states
+
+
+def new_kb(state, method="tt"):
+    """Empty KnowledgeBase for the clauses of a canned state"""
+    kb = KnowledgeBase(method)
+    kb.show_progress = False
+    # same ids in the same order, so the clauses mean the same
+    for symbol in state["symbols"]:
+        kb.symbol_id(symbol)
+    return kb
+
+
+def percentiles(samples):
+    """Latency summary in microseconds"""
+    samples = sorted(sample * 1e6 for sample in samples)
+    cuts = (
+        statistics.quantiles(samples, n=100, method="inclusive")
+        if len(samples) > 1
+        else samples * 99
+    )
+    return {
+        "count": len(samples),
+        "mean": statistics.mean(samples),
+        "p50": cuts[49],
+        "p90": cuts[89],
+        "p99": cuts[98],
+        "max": samples[-1],
+    }
+
+
+def bench_tell(states, repeat):
+    """Latency of every tell that builds the canned KBs"""
+    samples = []
+    for _ in range(repeat):
+        for state in states:
+            kb = new_kb(state)
+            for clause in state["clauses"]:
+                start = time.perf_counter()
+                kb.tell(clause)
+                samples.append(time.perf_counter() - start)
+    return {"latency_us": percentiles(samples)}
+
+
+def bench_ask(states, repeat, method="tt"):
+    """Latency of the batched neighbor safety query on the canned KBs, uncached"""
+    samples = []
+    models = 0
+    for _ in range(repeat):
+        for state in states:
+            kb = new_kb(state, method)
+            for clause in state["clauses"]:
+                kb.tell(clause)
+            start = time.perf_counter()
+            kb.ask_all(state["queries"])
+            samples.append(time.perf_counter() - start)
+            models += kb.stats["models_checked"]
+    result = {"latency_us": percentiles(samples)}
+    if method == "tt":
+        result["models_per_second"] = models / sum(samples)
+    return result
+
+
+def bench_agent_move(seeds, steps):
+    """Latency of Simulation.agent_move on random actions"""
+    rng = random.Random(0)
+    samples = []
+    for seed in seeds:
+        sim = Simulation(ROWS, COLUMNS, 0, seed=seed, verbose=False)
+        sim.generate_simulation()
+        for _ in range(steps):
+            action = rng.choice(ACTIONS[:EXIT])
+            start = time.perf_counter()
+            sim.agent_move(action)
+            samples.append(time.perf_counter() - start)
+    return {
+        "latency_us": percentiles(samples),
+        "steps_per_second": len(samples) / sum(samples),
+    }
+
+
+def bench_step(seeds, steps):
+    """Latency of Simulation.step on random action codes"""
+    rng = random.Random(0)
+    samples = []
+    for seed in seeds:
+        sim = Simulation(ROWS, COLUMNS, 0, seed=seed, verbose=False)
+        sim.generate_simulation()
+        for _ in range(steps):
+            action = rng.randrange(EXIT)
+            start = time.perf_counter()
+            sim.step(action)
+            samples.append(time.perf_counter() - start)
+    return {
+        "latency_us": percentiles(samples),
+        "steps_per_second": len(samples) / sum(samples),
+    }
+
+
+def bench_vector_step(count, steps):
+    """VectorSimulation.step on random action codes, with auto-reset"""
+    rng = random.Random(0)
+    env = VectorSimulation(count, ROWS, COLUMNS, seed=0)
+    env.reset()
+    batches = [[rng.randrange(EXIT) for _ in range(count)] for _ in range(steps)]
+    start = time.perf_counter()
+    for actions in batches:
+        env.step(actions)
+    elapsed = time.perf_counter() - start
+    return {"worlds": count, "steps_per_second": count * steps / elapsed}
+
+
+def bench_episodes(seeds, inference="frontier"):
+    """Whole headless episodes, see run_episode"""
+    samples = []
+    steps = 0
+    for seed in seeds:
+        start = time.perf_counter()
+        result = run_episode(seed, inference)
+        samples.append(time.perf_counter() - start)
+        steps += result["steps"]
+    return {
+        "latency_us": percentiles(samples),
+        "episodes_per_second": len(samples) / sum(samples),
+        "steps_per_second": steps / sum(samples),
+    }
+
+
+def bench_worlds(count):
+    """Bulk world generation, see generate_worlds"""
+    start = time.perf_counter()
+    generate_worlds(count, ROWS, COLUMNS, seed=0)
+    elapsed = time.perf_counter() - start
+    return {"count": count, "worlds_per_second": count / elapsed}
+
+
+def run_benchmarks(repeat=3, steps=1000, episodes=200, worlds=100000):
+    """Run every benchmark, returns the results as a JSON-ready dict"""
+    states = canned_kbs(FIXTURE_SEEDS)
+    return {
+        "python": platform.python_version(),
+        "fixtures": {"worlds": len(FIXTURE_SEEDS), "kb_states": len(states)},
+        "tell": bench_tell(states, repeat),
+        "ask_tt": bench_ask(states, repeat, "tt"),
+        "ask_dpll": bench_ask(states, repeat, "dpll"),
+        "ask_models": bench_ask(states, repeat, "models"),
+        "agent_move": bench_agent_move(FIXTURE_SEEDS, steps),
+        "step": bench_step(FIXTURE_SEEDS, steps),
+        "vector_step": bench_vector_step(1024, steps // 10),
+        "episode_frontier": bench_episodes(range(episodes), "frontier"),
+        "generate_worlds": bench_worlds(worlds),
+    }
+
+
+def main(arglist=None):
+    if arglist is None:
+        arglist = sys.argv
+    parser = argparse.ArgumentParser(prog="wwbench.py")
+    parser.add_argument("-repeat", type=int, default=3, help="passes over the KBs")
+    parser.add_argument("-steps", type=int, default=1000, help="moves per world")
+    parser.add_argument("-episodes", type=int, default=200)
+    parser.add_argument("-worlds", type=int, default=100000, help="worlds to generate")
+    parser.add_argument("-output", metavar="FILE", help="also write the JSON here")
+    args = parser.parse_args(arglist[1:])
+
+    results = run_benchmarks(args.repeat, args.steps, args.episodes, args.worlds)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
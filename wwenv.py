@@ -0,0 +1,168 @@
+# Wumpus World - Many worlds stepped in lockstep
+#
+# VectorSimulation holds K worlds as parallel lists, one entry per world,
+# and applies one action code per world in a single step call. The rules
+# are those of Simulation.step: the same action codes, costs, percept flags
+# and outcomes. A world whose episode ends is replaced by a new world from
+# the generator of the batch.
+
+import random
+from wwsim import *
+
+
+class VectorSimulation:
+    # rules tables are shared by every world: rooms are indexed as in
+    # Simulation.room, and facing codes as in FACINGS
+    __slots__ = (
+        "count",
+        "rowSize",
+        "colSize",
+        "pitDensity",
+        "rng",
+        "start",
+        "ahead",
+        "arrow_line",
+        "spare_worlds",
+        "worlds",
+        "position",
+        "facing",
+        "arrow",
+        "wumpus_alive",
+        "has_gold",
+        "percepts",
+    )
+
+    def __init__(self, count, rowSize=ROWS, colSize=COLUMNS, pitDensity=0.2, seed=None):
+        self.count = count
+        self.rowSize = rowSize
+        self.colSize = colSize
+        self.pitDensity = pitDensity
+        # every batch draws its worlds from its own generator
+        self.rng = random.Random(seed)
+        self.start = (rowSize - 1) * colSize  # bottom left corner
+        # ahead[room * 4 + facing] is the room a move goes to, or -1 for a
+        # bump, arrow_line[room * 4 + facing] the bitboard of the rooms an
+        # arrow shot from room flies through
+        self.ahead = []
+        self.arrow_line = []
+        for room in range(rowSize * colSize):
+            r, c = divmod(room, colSize)
+            for facing in range(len(FACINGS)):
+                nr = r + MOVE_ROWS[facing]
+                nc = c + MOVE_COLUMNS[facing]
+                inside = 0 <= nr < rowSize and 0 <= nc < colSize
+                self.ahead.append(nr * colSize + nc if inside else -1)
+                line = 0
+                while 0 <= nr < rowSize and 0 <= nc < colSize:
+                    line |= 1 << (nr * colSize + nc)
+                    nr = nr + MOVE_ROWS[facing]
+                    nc = nc + MOVE_COLUMNS[facing]
+                self.arrow_line.append(line)
+        self.spare_worlds = []
+        self.worlds = [None] * count
+        self.position = [self.start] * count
+        self.facing = [FACING_CODES["right"]] * count
+        self.arrow = [1] * count
+        self.wumpus_alive = [True] * count
+        self.has_gold = [False] * count
+        # percept flags, room by room for world 0, then world 1...
+        self.percepts = [0] * (count * rowSize * colSize)
+
+    def new_world(self):
+        # worlds are generated in bulk, see generate_worlds
+        if not self.spare_worlds:
+            self.spare_worlds = generate_worlds(
+                max(self.count, 256),
+                self.rowSize,
+                self.colSize,
+                self.pitDensity,
+                rng=self.rng,
+            )
+            self.spare_worlds.reverse()
+        return self.spare_worlds.pop()
+
+    def load_world(self, k, world):
+        # start a new episode in world k, returns its first percept
+        size = self.rowSize * self.colSize
+        self.worlds[k] = world
+        self.position[k] = self.start
+        self.facing[k] = FACING_CODES["right"]
+        self.arrow[k] = 1
+        self.wumpus_alive[k] = True
+        self.has_gold[k] = False
+        self.percepts[k * size : (k + 1) * size] = world_percepts(world)
+        return self.percepts[k * size + self.start]
+
+    def reset(self):
+        # new worlds everywhere, returns the first percept of each
+        return [self.load_world(k, self.new_world()) for k in range(self.count)]
+
+    def step(self, actions):
+        """Apply one action code per world.
+
+        Returns the lists (percepts, rewards, dones) as Simulation.step
+        would for each world. A world that is done is reset at once, so its
+        percept is the first one of its next episode.
+        """
+        size = self.rowSize * self.colSize
+        ahead = self.ahead
+        percepts = self.percepts
+        position = self.position
+        facing = self.facing
+        observations = []
+        rewards = []
+        dones = []
+        for k, action in enumerate(actions):
+            room = position[k]
+            here = k * size + room
+            world = self.worlds[k]
+            if action == EXIT:
+                observations.append(self.load_world(k, self.new_world()))
+                rewards.append(0)
+                dones.append(True)
+                continue
+
+            reward = -ACTION_COSTS[action]
+            if action == MOVE:
+                room = ahead[room * 4 + facing[k]]
+                if room >= 0:
+                    position[k] = room
+                    percepts[here] &= ~SCREAM
+                else:
+                    room = position[k]
+                    percepts[here] = percepts[here] & ~SCREAM | BUMP
+            elif action == SHOOT:
+                if self.arrow[k] != 0:
+                    if self.arrow_line[room * 4 + facing[k]] >> world.wumpus & 1:
+                        self.wumpus_alive[k] = False
+                    self.arrow[k] = 0
+                if not self.wumpus_alive[k]:
+                    percepts[here] = percepts[here] & ~BUMP | SCREAM
+            elif action == LEFT:
+                facing[k] = TURN_LEFT[facing[k]]
+                percepts[here] &= ~(BUMP | SCREAM)
+            elif action == RIGHT:
+                facing[k] = TURN_RIGHT[facing[k]]
+                percepts[here] &= ~(BUMP | SCREAM)
+            elif action == GRAB:
+                if room == world.gold:
+                    self.has_gold[k] = True
+
+            # terminal_test and update_score
+            done = True
+            if (self.wumpus_alive[k] and room == world.wumpus) or (
+                world.pits >> room & 1
+            ):
+                reward = reward - 1000
+            elif action == CLIMB and room == self.start:
+                if self.has_gold[k]:
+                    reward = reward + 1000
+            else:
+                done = False
+            if done:
+                observations.append(self.load_world(k, self.new_world()))
+            else:
+                observations.append(percepts[k * size + room])
+            rewards.append(reward)
+            dones.append(done)
+        return observations, rewards, dones
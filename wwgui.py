@@ -0,0 +1,281 @@
+# Tkinter display of the wumpus world simulation in wwsim.py
+# Split from wwsim.py so that the simulation can be used without loading Tk.
+
+from tkinter import *
+from wwsim import Simulation, COLUMNS, ROWS, FONTTYPE
+
+
+# Display class for running and modifying the GUI
+class Display:
+    score = None
+    pastMove = None
+    arrowStatus = None
+    arrowStatusDis = None
+    percepts = None
+    agentDirection = None
+
+    def set_room(self, r, c, sim):
+        # Returns agent image
+        if (sim.agentPos[0] == r) and (sim.agentPos[1] == c):
+            if sim.agentFacing.lower() == "right":
+                return PhotoImage(file="Images/agent-right.gif")
+            elif sim.agentFacing.lower() == "up":
+                return PhotoImage(file="Images/agent-up.gif")
+            elif sim.agentFacing.lower() == "left":
+                return PhotoImage(file="Images/agent-left.gif")
+            else:
+                return PhotoImage(file="Images/agent-down.gif")
+        # Returns start image
+        elif (r, c) == sim.start:
+            return PhotoImage(file="Images/start.gif")
+        # Returns wumpus
+        elif (r == sim.wumpusLoc[0]) and (c == sim.wumpusLoc[1]):
+            if sim.pits[sim.room(r, c)]:
+                return PhotoImage(file="Images/pit-wumpus.gif")
+            else:
+                return PhotoImage(file="Images/live-wumpus.gif")
+        # Returns gold and pit or gold
+        elif (r == sim.goldLocation[0]) and (c == sim.goldLocation[1]):
+            if sim.pits[sim.room(r, c)]:
+                return PhotoImage(file="Images/gold-pit.gif")
+            else:
+                return PhotoImage(file="Images/gold.gif")
+        # Returns a pit
+        elif sim.pits[sim.room(r, c)]:
+            return PhotoImage(file="Images/pit.gif")
+        # Returns an empty room
+        else:
+            return PhotoImage(file="Images/emptyroom.gif")
+
+    def __init__(self, master, simulation):
+        frame = Frame(master, width=700, height=500)
+        frame.pack()
+        self.grid = {}
+        self.score = StringVar()
+        self.pastMove = StringVar()
+        self.arrowStatus = StringVar()
+        self.percepts = StringVar()
+        self.agentDirection = StringVar()
+        self.score.set(str(0))
+        self.pastMove.set("None")
+        self.arrowStatus.set("Available")
+        self.agentDirection.set("Right")
+        self.percepts.set(str(simulation.percept(*simulation.start)))
+        theScoreDis = Label(master, font=(FONTTYPE, 16), text="Performance:")
+        lastMoveDis = Label(master, font=(FONTTYPE, 16), text="Last Move:")
+        performanceDis = Label(master, font=(FONTTYPE, 14), textvariable=self.score)
+        pastMoveDis = Label(master, font=(FONTTYPE, 14), textvariable=self.pastMove)
+        arrowTitle = Label(master, font=(FONTTYPE, 16), text="Arrow Status:")
+        self.arrowStatusDis = Label(
+            master, font=(FONTTYPE, 14), fg="Green", textvariable=self.arrowStatus
+        )
+        perceptsTitle = Label(master, font=(FONTTYPE, 16), text="Current Percepts:")
+        perceptsDis = Label(master, font=(FONTTYPE, 14), textvariable=self.percepts)
+        agentDirectionTitle = Label(master, font=(FONTTYPE, 16), text="Agent Facing:")
+        agentDirectionDis = Label(
+            master, font=(FONTTYPE, 14), textvariable=self.agentDirection
+        )
+        self.goldStatus = Label(
+            master, font=(FONTTYPE, 16), fg="Gold", text="Agent has gold!"
+        )
+        performanceDis.place(x=420, y=25)
+        theScoreDis.place(x=420, y=0)
+        arrowTitle.place(x=420, y=75)
+        self.arrowStatusDis.place(x=420, y=100)
+        lastMoveDis.place(x=420, y=150)
+        pastMoveDis.place(x=420, y=175)
+        perceptsTitle.place(x=5, y=420)
+        perceptsDis.place(x=5, y=445)
+        agentDirectionTitle.place(x=420, y=285)
+        agentDirectionDis.place(x=420, y=312)
+
+        # creating the initial grid
+        for r in range(simulation.rowSize):
+            for c in range(simulation.colSize):
+                tkimage = self.set_room(r, c, simulation)
+                self.grid[(r, c)] = Label(master, image=tkimage)
+                self.grid[(r, c)].image = tkimage
+                self.grid[(r, c)].place(x=c * 100 + c * 2, y=r * 100 + r * 2)
+
+        # initializations
+
+    def update_move(self, sim):
+        self.score.set(str(sim.score))
+        self.pastMove.set(sim.lastMove)
+        self.agentDirection.set(sim.agentFacing.title())
+        if sim.arrow == 0:
+            self.arrowStatus.set("Used")
+            self.arrowStatusDis.config(fg="Red")
+        if sim.lastPos != sim.agentPos:
+            r = sim.lastPos[0]
+            c = sim.lastPos[1]
+            tempImg = self.set_room(r, c, sim)
+            self.grid[(r, c)].config(image=tempImg)
+            self.grid[(r, c)].image = tempImg
+        r = sim.agentPos[0]
+        c = sim.agentPos[1]
+        tempImg = self.set_room(r, c, sim)
+        self.grid[(r, c)].config(image=tempImg)
+        self.grid[(r, c)].image = tempImg
+        currentPercepts = sim.percept(sim.agentPos[0], sim.agentPos[1])
+        self.percepts.set(str(currentPercepts))
+        if sim.hasGold:
+            self.goldStatus.place(x=500, y=225)
+        if sim.arrow == 0:
+            self.arrowStatus.set("Used")
+        if sim.wumpusAlive == False:
+            loc = sim.wumpusLoc
+            if sim.agentPos != sim.wumpusLoc:
+                temp = PhotoImage(file="Images/dead-wumpus.gif")
+            else:
+                temp = self.set_room(loc[0], loc[1], sim)
+            self.grid[loc].config(image=temp)
+            self.grid[loc].image = temp
+
+    def reset_display(self, sim):
+        for r in range(sim.rowSize):
+            for c in range(sim.colSize):
+                tkimage = self.set_room(r, c, sim)
+                self.grid[(r, c)].config(image=tkimage)
+                self.grid[(r, c)].image = tkimage
+        self.score.set(str(sim.score))
+        self.pastMove.set(sim.lastMove)
+        self.agentDirection.set(sim.agentFacing.title())
+        self.arrowStatus.set("Available")
+        self.arrowStatusDis.config(fg="Green")
+        currentPercepts = sim.percept(sim.agentPos[0], sim.agentPos[1])
+        self.percepts.set(str(currentPercepts))
+        self.goldStatus.place_forget()
+
+
+def run_gui():
+    print("Running GUI...")
+    # RUN SIMULATION WITH GUI DISPLAY
+    root = Tk()
+    root.wm_title("Wumpus World Simulation")
+    sim = Simulation(ROWS, COLUMNS, 0)
+    sim.generate_simulation()
+    app = Display(root, sim)
+
+    # Updates the sim with each move
+    def resetGame():
+        sim.reset()
+        app.reset_display(sim)
+        eaten.place_forget()
+        fell.place_forget()
+        climbOut.place_forget()
+        makeMove.place(x=420, y=225)
+
+    def updateSim():
+        if sim.endEpisode:
+            resetGame()
+            return
+        sim.move()
+        if sim.terminal_test() and sim.lastMove.lower() == "climb":
+            climbOut.place(x=420, y=400)
+            makeMove.place_forget()
+        elif sim.terminal_test():
+            if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
+                eaten.place(x=420, y=400)
+            else:
+                fell.place(x=420, y=400)
+            makeMove.place_forget()
+        app.update_move(sim)
+
+    # Methods for the buttons to operate the agent manually
+    def movePlayer():
+        sim.agent_move("move")
+        sim.update_score()
+        if sim.terminal_test():
+            if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
+                eaten.place(x=420, y=400)
+            else:
+                fell.place(x=420, y=400)
+            makeMove.place_forget()
+        app.update_move(sim)
+
+    def moveLeft():
+        sim.agent_move("left")
+        sim.update_score()
+        if sim.terminal_test():
+            if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
+                eaten.place(x=420, y=400)
+            else:
+                fell.place(x=420, y=400)
+            makeMove.place_forget()
+        app.update_move(sim)
+
+    def moveRight():
+        sim.agent_move("right")
+        sim.update_score()
+        if sim.terminal_test():
+            if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
+                eaten.place(x=420, y=400)
+            else:
+                fell.place(x=420, y=400)
+            makeMove.place_forget()
+        app.update_move(sim)
+
+    def grab():
+        sim.agent_move("grab")
+        sim.update_score()
+        if sim.terminal_test():
+            if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
+                eaten.place(x=420, y=400)
+            else:
+                fell.place(x=420, y=400)
+            makeMove.place_forget()
+        app.update_move(sim)
+
+    def climb():
+        sim.agent_move("climb")
+        sim.update_score()
+        if sim.terminal_test():
+            if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
+                eaten.place(x=420, y=400)
+            else:
+                fell.place(x=420, y=400)
+            makeMove.place_forget()
+        app.update_move(sim)
+
+    def shoot():
+        sim.agent_move("shoot")
+        sim.update_score()
+        if sim.terminal_test():
+            if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
+                eaten.place(x=420, y=400)
+            else:
+                fell.place(x=420, y=400)
+            makeMove.place_forget()
+        app.update_move(sim)
+
+    # The move button
+    makeMove = Button(root, text="Move", font=(FONTTYPE, 14), command=updateSim)
+    makeMove.place(x=420, y=225)
+
+    #       BELOW ARE BUTTONS FOR MANUALLY CONTROLLING THE AGENT
+    #       They can be used for testing the simulation runs properly
+    #       Uncomment the following lines to use them
+    #
+    go = Button(root, text="Go", font=(FONTTYPE, 14), command=movePlayer)
+    go.place(x=470, y=350)
+    left = Button(root, text="Left", font=(FONTTYPE, 14), command=moveLeft)
+    left.place(x=420, y=350)
+    right = Button(root, text="Right", font=(FONTTYPE, 14), command=moveRight)
+    right.place(x=515, y=350)
+    toGrab = Button(root, text="Grab", font=(FONTTYPE, 14), command=grab)
+    toGrab.place(x=500, y=435)
+    toClimb = Button(root, text="Climb", font=(FONTTYPE, 14), command=climb)
+    toClimb.place(x=570, y=435)
+    toShoot = Button(root, text="Shoot", font=(FONTTYPE, 14), command=shoot)
+    toShoot.place(x=420, y=390)
+
+    reset = Button(root, text="Reset", font=(FONTTYPE, 14), command=resetGame)
+    eaten = Label(root, text="WUMPUS ATE AGENT", fg="Red", font=(FONTTYPE, 16))
+    climbOut = Label(root, text="Player climbed out", fg="Green", font=(FONTTYPE, 18))
+    fell = Label(root, text="AGENT FELL IN PIT", fg="Red", font=(FONTTYPE, 16))
+
+    reset.place(x=420, y=435)
+
+    # Main simulation loop
+    root.mainloop()
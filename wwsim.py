@@ -2,13 +2,20 @@
 # File Name: wwsim.py
 # Author: Greg Scott
 #
-# Includes classes for the simulation and the Tkinter display of the simulation.
-# Also includes code to process the command-line input and run the program accordingly.
-
+# Includes classes for the simulation, the Tkinter display of the simulation is
+# in wwgui.py and only loaded for -gui. Also includes code to process the
+# command-line input and run the program accordingly, see main.
+
+import argparse
+import json
+import os
+import random
+import statistics
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from wwagent import *
-from tkinter import *
-from random import randint
+from wwworld import *
 
 # in your inner loop use it thus (just an example, I would probably use a named tuple)
 #
@@ -20,652 +27,529 @@ COLUMNS = 4
 ROWS = 4
 FONTTYPE = "Purisa"
 
+# Action codes of Simulation.step, ACTIONS[code] is the action's name
+MOVE, LEFT, RIGHT, GRAB, SHOOT, CLIMB, EXIT = range(7)
+ACTIONS = ("move", "left", "right", "grab", "shoot", "climb", "exit")
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+ACTION_COSTS = (1, 1, 1, 1, 10, 1, 0)
+LAST_MOVES = ("Move Forward", "Rotate Left", "Rotate Right", "Grab", "Shoot", "Climb")
+
+# Facing codes, turning and moving forward are lookups by facing code
+FACINGS = ("up", "right", "down", "left")
+FACING_CODES = {name: code for code, name in enumerate(FACINGS)}
+TURN_LEFT = (3, 0, 1, 2)
+TURN_RIGHT = (1, 2, 3, 0)
+MOVE_ROWS = (-1, 0, 1, 0)
+MOVE_COLUMNS = (0, 1, 0, -1)
+
 
 # SET UP CLASS AND METHODS HERE
 # Simulation class for running the underlying factors of the simulation
 class Simulation:
-    def __init__(self, rowSize, colSize, score):
+    # no per-instance dict, so that many simulations can be kept alive
+    __slots__ = (
+        "rowSize",
+        "colSize",
+        "start",
+        "pitDensity",
+        "rng",
+        "verbose",
+        "inference",
+        "agent",
+        "score",
+        "lastMove",
+        "lastPos",
+        "agentPos",
+        "agentFacing",
+        "arrow",
+        "wumpusAlive",
+        "pits",
+        "percepts",
+        "wumpusLoc",
+        "goldLocation",
+        "hasGold",
+        "endEpisode",
+    )
+
+    def __init__(
+        self,
+        rowSize,
+        colSize,
+        score,
+        seed=None,
+        verbose=True,
+        inference="kb",
+        pitDensity=0.2,
+    ):
         self.rowSize = rowSize
         self.colSize = colSize
-        self.agent = WWAgent()
+        self.start = (rowSize - 1, 0)  # bottom left corner
+        self.pitDensity = (
+            pitDensity  # chance that a room other than the start has a pit
+        )
+        # each simulation draws its worlds from its own generator
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+        self.inference = inference
+        # the agent is created on first use, see get_agent, so that a
+        # simulation only stepped by step stays small
+        self.agent = None
         self.score = score
         self.lastMove = "None"
-        self.lastPos = (3, 0)
-        self.agentPos = (3, 0)
+        self.lastPos = self.start
+        self.agentPos = self.start
         self.agentFacing = "right"
         self.arrow = 1
         self.wumpusAlive = True
-        self.pits = {}
-        self.percepts = {}
-        for r in range(self.rowSize):
-            for c in range(self.colSize):
-                self.percepts["room" + str(r) + str(c)] = (None, None, None, None, None)
+        # rooms are stored row by row, see room
+        self.pits = [False] * (self.rowSize * self.colSize)
+        self.percepts = [0] * (self.rowSize * self.colSize)  # see PERCEPTS
         self.wumpusLoc = (None, None)
         self.goldLocation = (None, None)
         self.hasGold = False
         self.endEpisode = False  # self termination
 
-    def set_percepts(self, r, c, item):
-        if item == "gold":
-            p = self.percepts["room" + str(r) + str(c)]
-            self.percepts["room" + str(r) + str(c)] = (
-                p[0],
-                p[1],
-                "glitter",
-                p[3],
-                p[4],
-            )
-        if item == "wumpus":
-            p = self.percepts["room" + str(r) + str(c)]
-            # self.percepts['room'+str(r)+str(c)] = ('stench', p[1], p[2], p[3], p[4])
-            if (r - 1) >= 0:
-                p = self.percepts["room" + str(r - 1) + str(c)]
-                self.percepts["room" + str(r - 1) + str(c)] = (
-                    "stench",
-                    p[1],
-                    p[2],
-                    p[3],
-                    p[4],
-                )
-            if (r + 1) < 4:
-                p = self.percepts["room" + str(r + 1) + str(c)]
-                self.percepts["room" + str(r + 1) + str(c)] = (
-                    "stench",
-                    p[1],
-                    p[2],
-                    p[3],
-                    p[4],
-                )
-            if (c - 1) >= 0:
-                p = self.percepts["room" + str(r) + str(c - 1)]
-                self.percepts["room" + str(r) + str(c - 1)] = (
-                    "stench",
-                    p[1],
-                    p[2],
-                    p[3],
-                    p[4],
-                )
-            if (c + 1) < 4:
-                p = self.percepts["room" + str(r) + str(c + 1)]
-                self.percepts["room" + str(r) + str(c + 1)] = (
-                    "stench",
-                    p[1],
-                    p[2],
-                    p[3],
-                    p[4],
-                )
-        if item == "pit":
-            if (r - 1) >= 0:
-                p = self.percepts["room" + str(r - 1) + str(c)]
-                self.percepts["room" + str(r - 1) + str(c)] = (
-                    p[0],
-                    "breeze",
-                    p[2],
-                    p[3],
-                    p[4],
-                )
-            if (r + 1) < 4:
-                p = self.percepts["room" + str(r + 1) + str(c)]
-                self.percepts["room" + str(r + 1) + str(c)] = (
-                    p[0],
-                    "breeze",
-                    p[2],
-                    p[3],
-                    p[4],
-                )
-            if (c - 1) >= 0:
-                p = self.percepts["room" + str(r) + str(c - 1)]
-                self.percepts["room" + str(r) + str(c - 1)] = (
-                    p[0],
-                    "breeze",
-                    p[2],
-                    p[3],
-                    p[4],
-                )
-            if (c + 1) < 4:
-                p = self.percepts["room" + str(r) + str(c + 1)]
-                self.percepts["room" + str(r) + str(c + 1)] = (
-                    p[0],
-                    "breeze",
-                    p[2],
-                    p[3],
-                    p[4],
-                )
+    def new_agent(self):
+        # the agent's world is square, with (0, 0) at the top left
+        return WWAgent(
+            inference=self.inference,
+            verbose=self.verbose,
+            size=self.rowSize,
+            pit_prior=self.pitDensity,
+        )
+
+    def get_agent(self):
+        # the simulation's own agent, new after each reset_stats
+        if self.agent is None:
+            self.agent = self.new_agent()
+        return self.agent
+
+    def room(self, r, c):
+        # index of room (r, c) in pits and percepts
+        return r * self.colSize + c
+
+    def neighbors(self, r, c):
+        rooms = []
+        if (r - 1) >= 0:
+            rooms.append((r - 1, c))
+        if (r + 1) < self.rowSize:
+            rooms.append((r + 1, c))
+        if (c - 1) >= 0:
+            rooms.append((r, c - 1))
+        if (c + 1) < self.colSize:
+            rooms.append((r, c + 1))
+        return rooms
+
+    def random_room(self):
+        return (self.rng.randrange(self.rowSize), self.rng.randrange(self.colSize))
 
     def generate_simulation(self):
         # Set wumpus location
-        self.wumpusLoc = (randint(0, 3), randint(0, 3))
-        while self.wumpusLoc == (3, 0):
-            self.wumpusLoc = (randint(0, 3), randint(0, 3))
-        # Set wumpus percepts
-        self.set_percepts(self.wumpusLoc[0], self.wumpusLoc[1], "wumpus")
+        self.wumpusLoc = self.random_room()
+        while self.wumpusLoc == self.start:
+            self.wumpusLoc = self.random_room()
         # Set gold location
-        self.goldLocation = (randint(0, 3), randint(0, 3))
-        while (self.goldLocation == (3, 0)) or (self.goldLocation == self.wumpusLoc):
-            self.goldLocation = (randint(0, 3), randint(0, 3))
-        # Set gold percepts
-        self.set_percepts(self.goldLocation[0], self.goldLocation[1], "gold")
+        self.goldLocation = self.random_room()
+        while (self.goldLocation == self.start) or (
+            self.goldLocation == self.wumpusLoc
+        ):
+            self.goldLocation = self.random_room()
         # Generate pits
+        pits = 0
         for r in range(self.rowSize):
             for c in range(self.colSize):
-                if (randint(1, 5) == 3) and ((r != 3) or (c != 0)):
-                    self.pits["room" + str(r) + str(c)] = True
-                    # Set pit percepts
-                    self.set_percepts(r, c, "pit")
-                else:
-                    self.pits["room" + str(r) + str(c)] = False
+                if (self.rng.random() < self.pitDensity) and ((r, c) != self.start):
+                    pits |= 1 << self.room(r, c)
+        self.load_world(
+            make_world(
+                self.rowSize,
+                self.colSize,
+                pits,
+                self.room(*self.wumpusLoc),
+                self.room(*self.goldLocation),
+            )
+        )
+
+    def load_world(self, world):
+        # play a World from wwworld, its percepts are derived from its bitboards
+        size = self.rowSize * self.colSize
+        self.wumpusLoc = divmod(world.wumpus, self.colSize)
+        self.goldLocation = divmod(world.gold, self.colSize)
+        self.pits = [bool(world.pits >> i & 1) for i in range(size)]
+        self.percepts = world_percepts(world)
+
+    def percept(self, r, c):
+        # percept tuple of room (r, c), as agents get it
+        return PERCEPTS[self.percepts[self.room(r, c)]]
 
     def reset_stats(self, newScore):
         self.agent = None
         self.score = newScore
         self.lastMove = "None"
-        self.lastPos = (3, 0)
-        self.agentPos = (3, 0)
+        self.lastPos = self.start
+        self.agentPos = self.start
         self.agentFacing = "right"
         self.arrow = 1
         self.hasGold = False
         self.wumpusAlive = True
-        self.percepts = {}
-        self.agent = WWAgent()
         self.endEpisode = False
-        for r in range(self.rowSize):
-            for c in range(self.colSize):
-                self.percepts["room" + str(r) + str(c)] = (None, None, None, None, None)
+        self.percepts = [0] * (self.rowSize * self.colSize)
 
     def agent_move(self, action):
-        if action == "exit":
+        # anything that is not another action turns right
+        self.apply_action(ACTION_CODES.get(action, RIGHT))
+
+    def apply_action(self, action):
+        # take an action code, the score is charged but not the outcome
+        if action == EXIT:
             self.endEpisode = True
             return
 
-        if action == "shoot":
-            self.score = self.score - 10
-        else:
-            self.score = self.score - 1
-        r = self.agentPos[0]
-        c = self.agentPos[1]
-        if action == "move":
+        self.score = self.score - ACTION_COSTS[action]
+        r, c = self.agentPos
+        here = r * self.colSize + c
+        percepts = self.percepts
+        if action == MOVE:
             self.lastPos = self.agentPos
-            bump = False
-            if self.agentFacing == "right":
-                if (c + 1) < 4:
-                    self.agentPos = (self.agentPos[0], self.agentPos[1] + 1)
-                else:
-                    bump = True
-            elif self.agentFacing == "up":
-                if (r - 1) >= 0:
-                    self.agentPos = (self.agentPos[0] - 1, self.agentPos[1])
-                else:
-                    bump = True
-            elif self.agentFacing == "left":
-                if (c - 1) >= 0:
-                    self.agentPos = (self.agentPos[0], self.agentPos[1] - 1)
-                else:
-                    bump = True
+            facing = FACING_CODES[self.agentFacing]
+            nr = r + MOVE_ROWS[facing]
+            nc = c + MOVE_COLUMNS[facing]
+            if 0 <= nr < self.rowSize and 0 <= nc < self.colSize:
+                self.agentPos = (nr, nc)
+                percepts[here] &= ~SCREAM
             else:
-                if (r + 1) < 4:
-                    self.agentPos = (self.agentPos[0] + 1, self.agentPos[1])
-                else:
-                    bump = True
-            if bump:
-                p = self.percepts["room" + str(r) + str(c)]
-                self.percepts["room" + str(r) + str(c)] = (
-                    p[0],
-                    p[1],
-                    p[2],
-                    "bump",
-                    p[4],
-                )
-            p = self.percepts["room" + str(r) + str(c)]
-            self.percepts["room" + str(r) + str(c)] = (p[0], p[1], p[2], p[3], None)
-            self.lastMove = "Move Forward"
-        elif action == "grab":
-            if self.agentPos == self.goldLocation:
-                self.hasGold = True
-            self.lastMove = "Grab"
-        elif action == "climb":
-            self.lastMove = "Climb"
-        elif action == "shoot":
+                # the bump is left on the room, as the agent stays there
+                percepts[here] = percepts[here] & ~SCREAM | BUMP
+        elif action == SHOOT:
             if self.arrow != 0:
-                if self.agentFacing == "up":
-                    if (c == self.wumpusLoc[1]) and (r > self.wumpusLoc[0]):
-                        self.wumpusAlive = False
-                elif self.agentFacing == "right":
-                    if (r == self.wumpusLoc[0]) and (c < self.wumpusLoc[1]):
-                        self.wumpusAlive = False
-                elif self.agentFacing == "left":
-                    if (r == self.wumpusLoc[0]) and (c > self.wumpusLoc[1]):
-                        self.wumpusAlive = False
-                else:
-                    if (c == self.wumpusLoc[1]) and (r < self.wumpusLoc[0]):
-                        self.wumpusAlive = False
+                facing = FACING_CODES[self.agentFacing]
+                dr = self.wumpusLoc[0] - r
+                dc = self.wumpusLoc[1] - c
+                # the wumpus is ahead on the line of the arrow
+                if (
+                    dr * MOVE_COLUMNS[facing] == 0
+                    and dc * MOVE_ROWS[facing] == 0
+                    and dr * MOVE_ROWS[facing] + dc * MOVE_COLUMNS[facing] > 0
+                ):
+                    self.wumpusAlive = False
                 self.arrow = 0
             if self.wumpusAlive == False:
-                p = self.percepts["room" + str(r) + str(c)]
-                self.percepts["room" + str(r) + str(c)] = (
-                    p[0],
-                    p[1],
-                    p[2],
-                    None,
-                    "scream",
-                )
-            self.lastMove = "Shoot"
-        else:
-            if action == "left":
-                if self.agentFacing == "right":
-                    self.agentFacing = "up"
-                elif self.agentFacing == "up":
-                    self.agentFacing = "left"
-                elif self.agentFacing == "left":
-                    self.agentFacing = "down"
-                else:
-                    self.agentFacing = "right"
-                self.lastMove = "Rotate Left"
-            else:
-                if self.agentFacing == "right":
-                    self.agentFacing = "down"
-                elif self.agentFacing == "down":
-                    self.agentFacing = "left"
-                elif self.agentFacing == "left":
-                    self.agentFacing = "up"
-                else:
-                    self.agentFacing = "right"
-                self.lastMove = "Rotate Right"
-            p = self.percepts["room" + str(r) + str(c)]
-            self.percepts["room" + str(r) + str(c)] = (p[0], p[1], p[2], None, None)
-        # print 'S-position: ', self.agentPos
+                percepts[here] = percepts[here] & ~BUMP | SCREAM
+        elif action == LEFT or action == RIGHT:
+            turns = TURN_LEFT if action == LEFT else TURN_RIGHT
+            self.agentFacing = FACINGS[turns[FACING_CODES[self.agentFacing]]]
+            percepts[here] &= ~(BUMP | SCREAM)
+        elif action == GRAB:
+            if self.agentPos == self.goldLocation:
+                self.hasGold = True
+        self.lastMove = LAST_MOVES[action]
+
+    def reset(self, seed=None):
+        # start an episode in a new world, returns its first percept flags;
+        # reseeding with seed makes this world and the next ones repeatable
+        if seed is not None:
+            self.rng.seed(seed)
+        self.reset_stats(0)
+        self.generate_simulation()
+        r, c = self.start
+        return self.percepts[r * self.colSize + c]
+
+    def step(self, action):
+        # take an action code or name, returns (percept, reward, done) with
+        # the percept flags of the new room and the change of score,
+        # including the outcome when the episode ends
+        if isinstance(action, str):
+            action = ACTION_CODES.get(action, RIGHT)
+        score = self.score
+        self.apply_action(action)
+        done = self.endEpisode or self.terminal_test()
+        if done:
+            self.update_score()
+        r, c = self.agentPos
+        return self.percepts[r * self.colSize + c], self.score - score, done
 
     def terminal_test(self):
-        r = self.agentPos[0]
-        c = self.agentPos[1]
-        if (self.agentPos == self.wumpusLoc) and (self.wumpusAlive == True):
-            return True
-        elif self.pits["room" + str(r) + str(c)]:
-            return True
-        elif (self.agentPos == (3, 0)) and self.lastMove.lower() == "climb":
-            return True
-        else:
-            return False
+        r, c = self.agentPos
+        return (
+            (self.wumpusAlive and self.agentPos == self.wumpusLoc)
+            or self.pits[r * self.colSize + c]
+            or (self.lastMove == "Climb" and self.agentPos == self.start)
+        )
 
     def update_score(self):
-        r = self.agentPos[0]
-        c = self.agentPos[1]
-        if (self.agentPos == self.wumpusLoc) and (self.wumpusAlive == True):
+        r, c = self.agentPos
+        if (self.wumpusAlive and self.agentPos == self.wumpusLoc) or self.pits[
+            r * self.colSize + c
+        ]:
             self.score = self.score - 1000
-        elif self.pits["room" + str(r) + str(c)]:
-            self.score = self.score - 1000
-        elif (self.agentPos == (3, 0)) and self.lastMove.lower() == "climb":
+        elif self.lastMove == "Climb" and self.agentPos == self.start:
             if self.hasGold:
                 self.score = self.score + 1000
 
     def move(self):
+        # one step of the simulation's own agent, see step
         p = self.agentPos
-        self.agent.update(self.percepts["room" + str(p[0]) + str(p[1])])
-        action = self.agent.action()
+        agent = self.get_agent()
+        agent.update(self.percept(p[0], p[1]))
+        action = agent.action()
         # print "Sim action: ", action
-        self.agent_move(action)
-
-
-# Display class for running and modifying the GUI
-class Display:
-    score = None
-    pastMove = None
-    arrowStatus = None
-    arrowStatusDis = None
-    percepts = None
-    agentDirection = None
-
-    def set_room(self, r, c, sim):
-        # Returns agent image
-        if (sim.agentPos[0] == r) and (sim.agentPos[1] == c):
-            if sim.agentFacing.lower() == "right":
-                return PhotoImage(file="Images/agent-right.gif")
-            elif sim.agentFacing.lower() == "up":
-                return PhotoImage(file="Images/agent-up.gif")
-            elif sim.agentFacing.lower() == "left":
-                return PhotoImage(file="Images/agent-left.gif")
-            else:
-                return PhotoImage(file="Images/agent-down.gif")
-        # Returns start image
-        elif (r == 3) and (c == 0):
-            return PhotoImage(file="Images/start.gif")
-        # Returns wumpus
-        elif (r == sim.wumpusLoc[0]) and (c == sim.wumpusLoc[1]):
-            if sim.pits["room" + str(r) + str(c)]:
-                return PhotoImage(file="Images/pit-wumpus.gif")
-            else:
-                return PhotoImage(file="Images/live-wumpus.gif")
-        # Returns gold and pit or gold
-        elif (r == sim.goldLocation[0]) and (c == sim.goldLocation[1]):
-            if sim.pits["room" + str(r) + str(c)]:
-                return PhotoImage(file="Images/gold-pit.gif")
-            else:
-                return PhotoImage(file="Images/gold.gif")
-        # Returns a pit
-        elif sim.pits["room" + str(r) + str(c)]:
-            return PhotoImage(file="Images/pit.gif")
-        # Returns an empty room
-        else:
-            return PhotoImage(file="Images/emptyroom.gif")
-
-    def __init__(self, master, simulation):
-        frame = Frame(master, width=700, height=500)
-        frame.pack()
-        self.grid = {}
-        self.score = StringVar()
-        self.pastMove = StringVar()
-        self.arrowStatus = StringVar()
-        self.percepts = StringVar()
-        self.agentDirection = StringVar()
-        self.score.set(str(0))
-        self.pastMove.set("None")
-        self.arrowStatus.set("Available")
-        self.agentDirection.set("Right")
-        self.percepts.set(str(simulation.percepts["room30"]))
-        theScoreDis = Label(master, font=(FONTTYPE, 16), text="Performance:")
-        lastMoveDis = Label(master, font=(FONTTYPE, 16), text="Last Move:")
-        performanceDis = Label(master, font=(FONTTYPE, 14), textvariable=self.score)
-        pastMoveDis = Label(master, font=(FONTTYPE, 14), textvariable=self.pastMove)
-        arrowTitle = Label(master, font=(FONTTYPE, 16), text="Arrow Status:")
-        self.arrowStatusDis = Label(
-            master, font=(FONTTYPE, 14), fg="Green", textvariable=self.arrowStatus
-        )
-        perceptsTitle = Label(master, font=(FONTTYPE, 16), text="Current Percepts:")
-        perceptsDis = Label(master, font=(FONTTYPE, 14), textvariable=self.percepts)
-        agentDirectionTitle = Label(master, font=(FONTTYPE, 16), text="Agent Facing:")
-        agentDirectionDis = Label(
-            master, font=(FONTTYPE, 14), textvariable=self.agentDirection
-        )
-        self.goldStatus = Label(
-            master, font=(FONTTYPE, 16), fg="Gold", text="Agent has gold!"
+        return self.step(action)
+
+
+def run_nongui(size=ROWS, pitDensity=0.2):
+    print("Running Non-GUI...")
+    print("\n")
+    # RUN SIMULATION WHILE WRITING TO standard output
+    sim = Simulation(size, size, 0, pitDensity=pitDensity)
+    sim.generate_simulation()
+    wl = sim.wumpusLoc
+    gl = sim.goldLocation
+    pl = []
+    for i in range(sim.rowSize):
+        for j in range(sim.colSize):
+            if sim.pits[sim.room(i, j)] is True:
+                pl.append((i, j))
+    moveCount = 0
+
+    # Print the steps
+    print("START OF SIMULATION")
+    while (sim.terminal_test() is not True) and (sim.endEpisode is not True):
+        print("------------------------------------------------------------------")
+        print("Move: ", moveCount)
+        print("Last Action: ", sim.lastMove)
+        print("\n")
+        print("Wumpus World Item Locations:")
+        print("Wumpus Location: ", wl, "   Gold Location: ", gl)
+        print("Pit Locations: ", str(pl))
+        print("\n")
+        print("Agent Info:")
+        print("Position: ", sim.agentPos, "   Facing: ", sim.agentFacing)
+        print("Has Gold: ", str(sim.hasGold), "   Arrow: ", sim.arrow)
+        print("\n")
+        print("Simlulation Current States:")
+        print("Wumpus Alive: ", str(sim.wumpusAlive), "   Performance: ", sim.score)
+        print(
+            "Current Percepts: ",
+            str(sim.percept(sim.agentPos[0], sim.agentPos[1])),
         )
-        performanceDis.place(x=420, y=25)
-        theScoreDis.place(x=420, y=0)
-        arrowTitle.place(x=420, y=75)
-        self.arrowStatusDis.place(x=420, y=100)
-        lastMoveDis.place(x=420, y=150)
-        pastMoveDis.place(x=420, y=175)
-        perceptsTitle.place(x=5, y=420)
-        perceptsDis.place(x=5, y=445)
-        agentDirectionTitle.place(x=420, y=285)
-        agentDirectionDis.place(x=420, y=312)
-
-        # creating the initial grid
-        for r in range(ROWS):
-            for c in range(COLUMNS):
-                tkimage = self.set_room(r, c, simulation)
-                self.grid["room" + str(r) + str(c)] = Label(master, image=tkimage)
-                self.grid["room" + str(r) + str(c)].image = tkimage
-                self.grid["room" + str(r) + str(c)].place(
-                    x=c * 100 + c * 2, y=r * 100 + r * 2
-                )
-
-        # initializations
-
-    def update_move(self, sim):
-        self.score.set(str(sim.score))
-        self.pastMove.set(sim.lastMove)
-        self.agentDirection.set(sim.agentFacing.title())
-        if sim.arrow == 0:
-            self.arrowStatus.set("Used")
-            self.arrowStatusDis.config(fg="Red")
-        if sim.lastPos != sim.agentPos:
-            r = sim.lastPos[0]
-            c = sim.lastPos[1]
-            tempImg = self.set_room(r, c, sim)
-            self.grid["room" + str(r) + str(c)].config(image=tempImg)
-            self.grid["room" + str(r) + str(c)].image = tempImg
-        r = sim.agentPos[0]
-        c = sim.agentPos[1]
-        tempImg = self.set_room(r, c, sim)
-        self.grid["room" + str(r) + str(c)].config(image=tempImg)
-        self.grid["room" + str(r) + str(c)].image = tempImg
-        currentPercepts = sim.percepts[
-            "room" + str(sim.agentPos[0]) + str(sim.agentPos[1])
-        ]
-        self.percepts.set(str(currentPercepts))
+        # Prompt agent to move
+        sim.move()
+        moveCount = moveCount + 1
+    # Print final result
+    print("------------------------------------------------------------------")
+    print("Last Action: ", sim.lastMove)
+    print("GAME OVER")
+    print("\n")
+    if sim.endEpisode:
         if sim.hasGold:
-            self.goldStatus.place(x=500, y=225)
-        if sim.arrow == 0:
-            self.arrowStatus.set("Used")
-        if sim.wumpusAlive == False:
-            loc = sim.wumpusLoc
-            if sim.agentPos != sim.wumpusLoc:
-                temp = PhotoImage(file="Images/dead-wumpus.gif")
-            else:
-                temp = self.set_room(loc[0], loc[1], sim)
-            self.grid["room" + str(loc[0]) + str(loc[1])].config(image=temp)
-            self.grid["room" + str(loc[0]) + str(loc[1])].image = temp
-
-    def reset_display(self, sim):
-        for r in range(ROWS):
-            for c in range(COLUMNS):
-                tkimage = self.set_room(r, c, sim)
-                self.grid["room" + str(r) + str(c)].config(image=tkimage)
-                self.grid["room" + str(r) + str(c)].image = tkimage
-        self.score.set(str(sim.score))
-        self.pastMove.set(sim.lastMove)
-        self.agentDirection.set(sim.agentFacing.title())
-        self.arrowStatus.set("Available")
-        self.arrowStatusDis.config(fg="Green")
-        currentPercepts = sim.percepts[
-            "room" + str(sim.agentPos[0]) + str(sim.agentPos[1])
+            print("Agent acquired the gold.")
+        else:
+            print("Agent left without the gold.")
+    elif sim.lastMove.lower() == "climb":
+        print("Agent has climbed out of cave.")
+    elif sim.agentPos == sim.wumpusLoc:
+        print("Agent was eaten by the wumpus and died!")
+    else:
+        print("Agent fell into pit and died!")
+    print("\n")
+    print("Final Performance: ", sim.score)
+
+
+def print_help():
+    print("------------------------------------------------------------------")
+    print("This python program runs a simulation of Wumpus World.")
+    print("\n")
+    print("To run the GUI represented version, run the following command:")
+    print(">\tpython wwsim.py -gui")
+    print("\n")
+    print("To run the Non-GUI version, run the following command:")
+    print(">\tpython wwsim.py -nongui [-size N] [-pits DENSITY]")
+    print("\n")
+    print("To run many headless episodes and print their statistics, run:")
+    print(">\tpython wwsim.py -batch EPISODES [-seed FIRST] [-inference kb|frontier]")
+    print(">\t                [-output FILE.json] [-workers N] [-chunksize N]")
+    print(">\t                [-size N] [-pits DENSITY]")
+    print("Use -workers 0 to run episodes on every core.")
+    print("------------------------------------------------------------------")
+
+
+def run_episode(seed, inference="kb", max_moves=1000, size=ROWS, pitDensity=0.2):
+    """Run one headless episode, returns its results as a dict"""
+    sim = Simulation(
+        size, size, 0, verbose=False, inference=inference, pitDensity=pitDensity
+    )
+    percept = sim.reset(seed)
+    agent = sim.get_agent()
+    moves = 0
+    agent_time = 0.0
+    done = False
+    while not done and moves < max_moves:
+        start = time.perf_counter()
+        agent.update(PERCEPTS[percept])
+        action = agent.action()
+        agent_time += time.perf_counter() - start
+        percept, reward, done = sim.step(action)
+        moves = moves + 1
+
+    if sim.terminal_test():
+        if sim.lastMove.lower() == "climb":
+            outcome = "climbed"
+        elif (sim.agentPos == sim.wumpusLoc) and sim.wumpusAlive:
+            outcome = "wumpus"
+        else:
+            outcome = "pit"
+    elif sim.endEpisode:
+        outcome = "exited"
+    else:
+        outcome = "move_limit"
+    return {
+        "seed": seed,
+        "score": sim.score,
+        "steps": moves,
+        "outcome": outcome,
+        "has_gold": sim.hasGold,
+        "inference_time": agent_time,
+        "asks": agent.kb.stats["asks"],
+    }
+
+
+def summarize(results):
+    """Aggregate statistics over the results of run_episode, at least one"""
+    scores = [result["score"] for result in results]
+    steps = [result["steps"] for result in results]
+    times = [result["inference_time"] for result in results]
+    outcomes = {}
+    for result in results:
+        outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+    deciles = (
+        statistics.quantiles(scores, n=10, method="inclusive")
+        if len(scores) > 1
+        else scores * 9
+    )
+    return {
+        "episodes": len(results),
+        "win_rate": sum(result["has_gold"] for result in results) / len(results),
+        "score": {
+            "mean": statistics.mean(scores),
+            "stdev": statistics.pstdev(scores),
+            "min": min(scores),
+            "p10": deciles[0],
+            "median": statistics.median(scores),
+            "p90": deciles[-1],
+            "max": max(scores),
+        },
+        "steps": {"mean": statistics.mean(steps), "max": max(steps)},
+        "outcomes": outcomes,
+        "deaths": {
+            "wumpus": outcomes.get("wumpus", 0),
+            "pit": outcomes.get("pit", 0),
+        },
+        "inference_time": {"total": sum(times), "mean": statistics.mean(times)},
+    }
+
+
+def run_chunk(seeds, options):
+    """Run the episodes for a list of seeds, in a worker process"""
+    return [run_episode(seed, **options) for seed in seeds]
+
+
+def iter_episodes(seeds, workers=1, chunksize=None, **options):
+    """Yield the results of the episodes for seeds as they finish.
+
+    options are passed on to run_episode. With more than one worker the
+    seeds are split in chunks that run on a process pool, so results come
+    back in completion order.
+    """
+    if workers <= 1:
+        for seed in seeds:
+            yield run_episode(seed, **options)
+        return
+    if chunksize is None:
+        # a few chunks per worker keeps them busy when episode lengths vary
+        chunksize = max(1, len(seeds) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_chunk, seeds[i : i + chunksize], options)
+            for i in range(0, len(seeds), chunksize)
         ]
-        self.percepts.set(str(currentPercepts))
-        self.goldStatus.place_forget()
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def run_batch(episodes, seed=0, output=None, workers=1, chunksize=None, **options):
+    """Run episodes with seeds seed, seed + 1, ... and print their summary.
+
+    options are passed on to run_episode.
+    """
+    if episodes < 1:
+        raise ValueError("a batch needs at least one episode")
+    if workers == 0:
+        workers = os.cpu_count()
+    print("Running", episodes, "episodes on", workers, "worker(s)...")
+    results = []
+    for result in iter_episodes(
+        list(range(seed, seed + episodes)), workers, chunksize, **options
+    ):
+        results.append(result)
+        if sys.stdout.isatty():
+            print(f"\rFinished {len(results)}/{episodes}", end="")
+    if sys.stdout.isatty():
+        print()
+    # completion order depends on scheduling, the summary must not
+    results.sort(key=lambda result: result["seed"])
+    summary = summarize(results)
+    print(json.dumps(summary, indent=2))
+    if output:
+        with open(output, "w") as f:
+            json.dump({"summary": summary, "episodes": results}, f, indent=2)
+    return summary
 
 
 # Interpret command-line call with arguments
-
-arglist = sys.argv
-if len(sys.argv) == 2:
-    if arglist[1].lower() == "-gui":
-        print("Running GUI...")
-        # RUN SIMULATION WITH GUI DISPLAY
-        root = Tk()
-        root.wm_title("Wumpus World Simulation")
-        sim = Simulation(ROWS, COLUMNS, 0)
-        sim.generate_simulation()
-        app = Display(root, sim)
-
-        # Updates the sim with each move
-        def resetGame():
-            sim.reset_stats(0)
-            sim.generate_simulation()
-            app.reset_display(sim)
-            eaten.place_forget()
-            fell.place_forget()
-            climbOut.place_forget()
-            makeMove.place(x=420, y=225)
-
-        def updateSim():
-            if sim.endEpisode:
-                resetGame()
-                return
-            sim.move()
-            sim.update_score()
-            if sim.terminal_test() and sim.lastMove.lower() == "climb":
-                climbOut.place(x=420, y=400)
-                makeMove.place_forget()
-            elif sim.terminal_test():
-                if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
-                    eaten.place(x=420, y=400)
-                else:
-                    fell.place(x=420, y=400)
-                makeMove.place_forget()
-            app.update_move(sim)
-
-        # Methods for the buttons to operate the agent manually
-        def movePlayer():
-            sim.agent_move("move")
-            sim.update_score()
-            if sim.terminal_test():
-                if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
-                    eaten.place(x=420, y=400)
-                else:
-                    fell.place(x=420, y=400)
-                makeMove.place_forget()
-            app.update_move(sim)
-
-        def moveLeft():
-            sim.agent_move("left")
-            sim.update_score()
-            if sim.terminal_test():
-                if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
-                    eaten.place(x=420, y=400)
-                else:
-                    fell.place(x=420, y=400)
-                makeMove.place_forget()
-            app.update_move(sim)
-
-        def moveRight():
-            sim.agent_move("right")
-            sim.update_score()
-            if sim.terminal_test():
-                if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
-                    eaten.place(x=420, y=400)
-                else:
-                    fell.place(x=420, y=400)
-                makeMove.place_forget()
-            app.update_move(sim)
-
-        def grab():
-            sim.agent_move("grab")
-            sim.update_score()
-            if sim.terminal_test():
-                if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
-                    eaten.place(x=420, y=400)
-                else:
-                    fell.place(x=420, y=400)
-                makeMove.place_forget()
-            app.update_move(sim)
-
-        def climb():
-            sim.agent_move("climb")
-            sim.update_score()
-            if sim.terminal_test():
-                if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
-                    eaten.place(x=420, y=400)
-                else:
-                    fell.place(x=420, y=400)
-                makeMove.place_forget()
-            app.update_move(sim)
-
-        def shoot():
-            sim.agent_move("shoot")
-            sim.update_score()
-            if sim.terminal_test():
-                if (sim.agentPos == sim.wumpusLoc) and (sim.wumpusAlive is True):
-                    eaten.place(x=420, y=400)
-                else:
-                    fell.place(x=420, y=400)
-                makeMove.place_forget()
-            app.update_move(sim)
-
-        # The move button
-        makeMove = Button(root, text="Move", font=(FONTTYPE, 14), command=updateSim)
-        makeMove.place(x=420, y=225)
-
-        #       BELOW ARE BUTTONS FOR MANUALLY CONTROLLING THE AGENT
-        #       They can be used for testing the simulation runs properly
-        #       Uncomment the following lines to use them
-        #
-        go = Button(root, text="Go", font=(FONTTYPE, 14), command=movePlayer)
-        go.place(x=470, y=350)
-        left = Button(root, text="Left", font=(FONTTYPE, 14), command=moveLeft)
-        left.place(x=420, y=350)
-        right = Button(root, text="Right", font=(FONTTYPE, 14), command=moveRight)
-        right.place(x=515, y=350)
-        toGrab = Button(root, text="Grab", font=(FONTTYPE, 14), command=grab)
-        toGrab.place(x=500, y=435)
-        toClimb = Button(root, text="Climb", font=(FONTTYPE, 14), command=climb)
-        toClimb.place(x=570, y=435)
-        toShoot = Button(root, text="Shoot", font=(FONTTYPE, 14), command=shoot)
-        toShoot.place(x=420, y=390)
-
-        reset = Button(root, text="Reset", font=(FONTTYPE, 14), command=resetGame)
-        eaten = Label(root, text="WUMPUS ATE AGENT", fg="Red", font=(FONTTYPE, 16))
-        climbOut = Label(
-            root, text="Player climbed out", fg="Green", font=(FONTTYPE, 18)
+def main(arglist=None):
+    if arglist is None:
+        arglist = sys.argv
+    parser = argparse.ArgumentParser(prog="wwsim.py", add_help=False)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("-gui", action="store_true")
+    mode.add_argument("-nongui", action="store_true")
+    mode.add_argument("-batch", type=int, metavar="EPISODES")
+    mode.add_argument("-help", action="store_true")
+    parser.add_argument("-seed", type=int, default=0)
+    parser.add_argument("-inference", choices=["kb", "frontier"], default="kb")
+    parser.add_argument("-output", metavar="FILE")
+    parser.add_argument("-workers", type=int, default=1, help="0 for every core")
+    parser.add_argument("-size", type=int, default=ROWS, help="rooms per side")
+    parser.add_argument("-pits", type=float, default=0.2, help="pit density")
+    parser.add_argument("-chunksize", type=int)
+    # flags were always case insensitive
+    args = parser.parse_args(
+        [arg.lower() if arg.startswith("-") else arg for arg in arglist[1:]]
+    )
+
+    if args.gui:
+        # tkinter is only imported when the display is needed
+        from wwgui import run_gui
+
+        run_gui()
+    elif args.nongui:
+        run_nongui(args.size, args.pits)
+    elif args.batch is not None:
+        if args.batch < 1:
+            parser.error("-batch needs at least one episode")
+        run_batch(
+            args.batch,
+            args.seed,
+            args.output,
+            args.workers,
+            args.chunksize,
+            inference=args.inference,
+            size=args.size,
+            pitDensity=args.pits,
         )
-        fell = Label(root, text="AGENT FELL IN PIT", fg="Red", font=(FONTTYPE, 16))
-
-        reset.place(x=420, y=435)
+    else:
+        print_help()
 
-        # Main simulation loop
-        root.mainloop()
-        #
-    elif arglist[1].lower() == "-nongui":
-        print("Running Non-GUI...")
-        print("\n")
-        # RUN SIMULATION WHILE WRITING TO standard output
-        sim = Simulation(ROWS, COLUMNS, 0)
-        sim.generate_simulation()
-        wl = sim.wumpusLoc
-        gl = sim.goldLocation
-        pl = []
-        for i in range(4):
-            for j in range(4):
-                if sim.pits["room" + str(i) + str(j)] is True:
-                    pl.append((i, j))
-        moveCount = 0
-
-        # Print the steps
-        print("START OF SIMULATION")
-        while (sim.terminal_test() is not True) and (sim.endEpisode is not True):
-            print("------------------------------------------------------------------")
-            print("Move: ", moveCount)
-            print("Last Action: ", sim.lastMove)
-            print("\n")
-            print("Wumpus World Item Locations:")
-            print("Wumpus Location: ", wl, "   Gold Location: ", gl)
-            print("Pit Locations: ", str(pl))
-            print("\n")
-            print("Agent Info:")
-            print("Position: ", sim.agentPos, "   Facing: ", sim.agentFacing)
-            print("Has Gold: ", str(sim.hasGold), "   Arrow: ", sim.arrow)
-            print("\n")
-            print("Simlulation Current States:")
-            print("Wumpus Alive: ", str(sim.wumpusAlive), "   Performance: ", sim.score)
-            print(
-                "Current Percepts: ",
-                str(sim.percepts["room" + str(sim.agentPos[0]) + str(sim.agentPos[1])]),
-            )
-            # Prompt agent to move
-            sim.move()
-            sim.update_score()
-            moveCount = moveCount + 1
-        # Print final result
-        print("------------------------------------------------------------------")
-        print("Last Action: ", sim.lastMove)
-        print("GAME OVER")
-        print("\n")
-        if sim.endEpisode:
-            if sim.hasGold:
-                print("Agent acquired the gold.")
-            else:
-                print("Agent left without the gold.")
-        elif sim.lastMove.lower() == "climb":
-            print("Agent has climbed out of cave.")
-        elif sim.agentPos == sim.wumpusLoc:
-            print("Agent was eaten by the wumpus and died!")
-        else:
-            print("Agent fell into pit and died!")
-        print("\n")
-        print("Final Performance: ", sim.score)
 
-    elif arglist[1].lower() == "-help":
-        print("------------------------------------------------------------------")
-        print("This python program runs a simulation of Wumpus World.")
-        print("\n")
-        print("To run the GUI represented version, run the following command:")
-        print(">\tpython wwsim.py -gui")
-        print("\n")
-        print("To run the Non-GUI version, run the following command:")
-        print(">\tpython wwsim.py -nongui")
-        print("------------------------------------------------------------------")
-    else:
-        raise Exception(
-            "Invalid command-line argument. Run 'python wwsim.py -help' for help."
-        )
-else:
-    raise Exception("Invalid command-line call. Run 'python wwsim.py -help' for help.")
+if __name__ == "__main__":
+    main()
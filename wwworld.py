@@ -0,0 +1,155 @@
+# Wumpus World - World generation on bitboards
+#
+# A world is stored as bitboards: Python ints with bit r * cols + c set for
+# room (r, c), the same order as Simulation.room. Percepts are derived from
+# the pit and wumpus boards by shifting them onto their neighbors, and pits
+# for many worlds are drawn at once with a few wide random integers.
+#
+# A percept is a 5 bit int, one flag per slot of the percept tuple that
+# agents get, see PERCEPTS for the tuple of each percept.
+
+import random
+from collections import namedtuple
+
+# Percept flags, in the order of the percept tuple
+STENCH = 1
+BREEZE = 2
+GLITTER = 4
+BUMP = 8
+SCREAM = 16
+PERCEPT_NAMES = ("stench", "breeze", "glitter", "bump", "scream")
+
+# PERCEPTS[percept] is its tuple, built once so agents can be given one
+# without allocating
+PERCEPTS = tuple(
+    tuple(name if percept >> i & 1 else None for i, name in enumerate(PERCEPT_NAMES))
+    for percept in range(1 << len(PERCEPT_NAMES))
+)
+
+
+def encode_percept(percept):
+    """Percept flags of a percept tuple"""
+    bits = 0
+    for i, name in enumerate(PERCEPT_NAMES):
+        if name in percept:
+            bits |= 1 << i
+    return bits
+
+
+def percept_names(percept):
+    """Names of the flags set in a percept"""
+    return [name for name in PERCEPTS[percept] if name]
+
+
+# pits, breeze and stench are bitboards, wumpus and gold are room indexes
+World = namedtuple(
+    "World", ["rows", "cols", "pits", "wumpus", "gold", "breeze", "stench"]
+)
+
+
+def edge_masks(rows, cols):
+    """Bitboards of every room, and of the rooms not in the first / last column"""
+    cells = (1 << (rows * cols)) - 1
+    first_column = 0
+    for r in range(rows):
+        first_column |= 1 << (r * cols)
+    last_column = first_column << (cols - 1)
+    return cells, cells & ~first_column, cells & ~last_column
+
+
+def adjacent(board, rows, cols, masks=None):
+    """Bitboard of the rooms next to a room of board"""
+    cells, not_first, not_last = masks or edge_masks(rows, cols)
+    return (
+        (board >> cols)  # room below -> room above
+        | ((board << cols) & cells)
+        | ((board >> 1) & not_last)  # a shift right to left must not wrap a row
+        | ((board << 1) & not_first)
+    )
+
+
+def make_world(rows, cols, pits, wumpus, gold, masks=None):
+    """World with its breeze and stench derived from the pits and the wumpus"""
+    masks = masks or edge_masks(rows, cols)
+    return World(
+        rows,
+        cols,
+        pits,
+        wumpus,
+        gold,
+        adjacent(pits, rows, cols, masks),
+        adjacent(1 << wumpus, rows, cols, masks),
+    )
+
+
+def world_percepts(world):
+    """Percept flags of each room of world, before the agent does anything"""
+    return [
+        (world.stench >> i & 1) * STENCH
+        | (world.breeze >> i & 1) * BREEZE
+        | (i == world.gold) * GLITTER
+        for i in range(world.rows * world.cols)
+    ]
+
+
+def bernoulli_bits(rng, lanes, p):
+    """lanes independent bits that are each set with probability p.
+
+    Every lane compares its own uniform random number with p one binary
+    digit at a time, all lanes in parallel: a lane is decided at the first
+    digit where the two differ, about two digits on average.
+    """
+    result = 0
+    undecided = (1 << lanes) - 1
+    if p >= 1:
+        # a digit of 2 would be read as 0 below
+        return undecided
+    for _ in range(53):  # binary digits of a float
+        if not undecided or p <= 0:
+            break
+        p = p * 2
+        digit = int(p)
+        p = p - digit
+        bits = rng.getrandbits(lanes)
+        if digit:
+            # random digit 0 under p's 1: the number is below p
+            result |= undecided & ~bits
+            undecided &= bits
+        else:
+            undecided &= ~bits
+    return result
+
+
+def generate_worlds(count, rows=4, cols=4, pitDensity=0.2, seed=None, rng=None):
+    """Draw count worlds with the same rules as Simulation.generate_simulation.
+
+    The wumpus and the gold are placed uniformly away from the start, which
+    is the bottom left room, and each other room has a pit with probability
+    pitDensity. The worlds are drawn from rng if given, else from a new
+    generator seeded with seed.
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    masks = edge_masks(rows, cols)
+    size = rows * cols
+    start = (rows - 1) * cols
+    # one byte aligned lane per world, so worlds can be cut out of the bytes
+    width = (size + 7) // 8
+    pit_bytes = bernoulli_bits(rng, count * width * 8, pitDensity).to_bytes(
+        count * width, "little"
+    )
+    no_start = masks[0] & ~(1 << start)
+
+    worlds = []
+    for i in range(count):
+        pits = int.from_bytes(pit_bytes[i * width : (i + 1) * width], "little")
+        wumpus = rng.randrange(size - 1)
+        if wumpus >= start:
+            wumpus += 1
+        # skip the start and the wumpus, in increasing order
+        gold = rng.randrange(size - 2)
+        for taken in sorted((start, wumpus)):
+            if gold >= taken:
+                gold += 1
+        worlds.append(make_world(rows, cols, pits & no_start, wumpus, gold, masks))
+    return worlds